@@ -1,8 +1,14 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, send_file, flash
+from flask import (Flask, Response, render_template, request, redirect, url_for, jsonify, flash, session, g,
+                   stream_with_context)
+from werkzeug.local import LocalProxy
 from src.models.transaction_model import EnhancedTransactionManager, Transaction
-from src.parsers.ai_parser import EnhancedAITransactionParser, AITransaction
+from src.models.storage_backends import open_storage_backend
+from src.models.workspace_registry import WorkspaceRegistry, is_valid_household_id
+from src.parsers.csv_parser import iter_csv_export
+from src.utils.analytics_export import EXPORT_FORMATS, available_formats
+from src.parsers.ai_parser import EnhancedAITransactionParser
 from src.utils.storage_manager import StorageManager
-from config.settings import config
+from config.settings import config, PUBLIC_SECRET_KEYS
 try:
     from src.parsers.plaid_parser import PlaidTransactionParser, PlaidTransaction
     PLAID_AVAILABLE = True
@@ -12,24 +18,112 @@ except ImportError:
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 import os
-import tempfile
+import hmac
+import hashlib
 import json
+import zlib
+import atexit
+import multiprocessing
 
 # Initialize Flask app with configuration
 app = Flask(__name__, template_folder='templates')
 app.config.from_object(config['development'])
 
+# Sessions signed with a published key can be forged, so other households stay closed under one
+if app.config['WORKSPACE_ACCESS_CODES'] and app.config['SECRET_KEY'] in PUBLIC_SECRET_KEYS:
+    print("WORKSPACE_ACCESS_CODES ignored - set SECRET_KEY to a private value to enable other households")
+    app.config['WORKSPACE_ACCESS_CODES'] = {}
+
 # Initialize managers
-transaction_manager = EnhancedTransactionManager()
+def open_workspace_manager(data_file: str, db_file: str) -> EnhancedTransactionManager:
+    """Build the transaction manager for one household's store"""
+    return EnhancedTransactionManager(storage=open_storage_backend(
+        app.config['TRANSACTIONS_BACKEND'],
+        data_file=data_file,
+        db_file=db_file,
+        use_journal=app.config['TRANSACTIONS_JOURNAL'],
+        journal_compact_threshold=app.config['JOURNAL_COMPACT_THRESHOLD'],
+        snapshot_format=app.config['TRANSACTIONS_SNAPSHOT_FORMAT'],
+        write_behind_interval=app.config['TRANSACTIONS_WRITE_BEHIND_INTERVAL'],
+        shared=app.config['TRANSACTIONS_MULTIPROCESS']
+    ), background_load=app.config['TRANSACTIONS_BACKGROUND_LOAD'])
+
+# Rows parsed for review (AI uploads, Plaid fetches) wait here until added or cleared,
+# one queue per household so staged rows are only ever committed to their own household
+staged_rows = {}
+
+def staged(kind: str) -> list:
+    """The current household's review queue of one kind"""
+    # Pin the household for the request, so its queues are only dropped once it is evicted while idle
+    get_transaction_manager()
+    return staged_rows.setdefault((g.household_id, kind), [])
+
+def drop_staged_rows(household_id: str):
+    """Forget an evicted household's review queues"""
+    for key in [key for key in list(staged_rows) if key[0] == household_id]:
+        staged_rows.pop(key, None)
+
+# Each household gets its own store; the default household keeps the original files
+workspaces = WorkspaceRegistry(
+    open_workspace_manager,
+    workspaces_dir=app.config['WORKSPACES_DIR'],
+    default_household=app.config['DEFAULT_HOUSEHOLD'],
+    default_files=(app.config['TRANSACTIONS_FILE'], app.config['TRANSACTIONS_DB']),
+    max_loaded=app.config['WORKSPACES_MAX_LOADED'],
+    memory_budget_bytes=app.config['WORKSPACES_MEMORY_BUDGET_MB'] * 1024 * 1024,
+    on_evict=drop_staged_rows
+)
+atexit.register(workspaces.close_all)
+
+# Start loading the default household so the first request does not wait for it
+# (not in spawned CSV import workers, which re-import the main module)
+if multiprocessing.parent_process() is None:
+    workspaces.get(app.config['DEFAULT_HOUSEHOLD'])
+
+def household_access_allowed(household_id: str, access_code: str) -> bool:
+    """Whether an access code opens a household: any code for the default one, else its configured code"""
+    if household_id == app.config['DEFAULT_HOUSEHOLD']:
+        return True
+    expected = app.config['WORKSPACE_ACCESS_CODES'].get(household_id)
+    if not expected:
+        return False
+    return hmac.compare_digest(expected.encode(), access_code.encode())
+
+def household_proof(household_id: str, access_code: str) -> str:
+    """Session token showing the household's access code was checked; changes when the code does"""
+    message = f"{household_id}:{access_code}".encode()
+    return hmac.new(app.config['SECRET_KEY'].encode(), message, hashlib.sha256).hexdigest()
+
+def current_household_id() -> str:
+    """Household the current session is working in"""
+    # Re-check the session's proof against the configured code, so revoked or changed codes stop counting
+    household_id = session.get('household_id')
+    if household_id and household_id != app.config['DEFAULT_HOUSEHOLD']:
+        expected = app.config['WORKSPACE_ACCESS_CODES'].get(household_id)
+        proof = session.get('household_proof')
+        if expected and isinstance(proof, str) and hmac.compare_digest(
+                proof.encode(), household_proof(household_id, expected).encode()):
+            return household_id
+    return app.config['DEFAULT_HOUSEHOLD']
+
+def get_transaction_manager() -> EnhancedTransactionManager:
+    """Manager of the current request's household, pinned in the registry until the request ends"""
+    if 'transaction_manager' not in g:
+        g.household_id = current_household_id()
+        g.transaction_manager = workspaces.checkout(g.household_id)
+    return g.transaction_manager
+
+# Routes use transaction_manager as before; it resolves to the session's household
+transaction_manager = LocalProxy(get_transaction_manager)
 ai_parser = EnhancedAITransactionParser()
 storage_manager = StorageManager()
 
-# Global storage for AI transactions and extracted texts
-ai_transactions = []
-extracted_texts = []
+# AI transactions and extracted texts awaiting review
+ai_transactions = LocalProxy(lambda: staged('ai_transactions'))
+extracted_texts = LocalProxy(lambda: staged('extracted_texts'))
 
-# Global storage for Plaid transactions
-plaid_transactions_list = []
+# Plaid transactions awaiting review
+plaid_transactions_list = LocalProxy(lambda: staged('plaid_transactions'))
 plaid_parser = None
 
 # Configure upload settings
@@ -37,6 +131,9 @@ UPLOAD_FOLDER = app.config['UPLOAD_FOLDER']
 ALLOWED_EXTENSIONS = app.config['ALLOWED_EXTENSIONS']
 AI_ALLOWED_EXTENSIONS = app.config['AI_ALLOWED_EXTENSIONS']
 
+# Largest page /api/transactions will return
+MAX_PAGE_SIZE = 500
+
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
@@ -46,38 +143,49 @@ def allowed_file(filename):
 def allowed_ai_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in AI_ALLOWED_EXTENSIONS
 
+@app.before_request
+def refresh_transactions():
+    """Pick up changes other worker processes made to the transaction store"""
+    transaction_manager.refresh()
+
+@app.teardown_request
+def release_workspace(exception=None):
+    """Unpin the request's household so the registry may evict it once idle"""
+    if g.pop('transaction_manager', None) is not None:
+        workspaces.release(g.pop('household_id'))
+
 # Routes
 @app.route('/')
 def index():
     return redirect(url_for('dashboard'))
 
+@app.route('/workspace/<household_id>', methods=['POST'])
+def switch_workspace(household_id):
+    """Route this session's requests to another household's transactions (needs its access code)"""
+    if not is_valid_household_id(household_id):
+        flash('Invalid household id', 'error')
+    elif not household_access_allowed(household_id, request.form.get('access_code', '')):
+        flash('Unknown household or wrong access code', 'error')
+    else:
+        session['household_id'] = household_id
+        session['household_proof'] = household_proof(household_id, request.form.get('access_code', ''))
+        flash(f'Switched to household {household_id}', 'success')
+    return redirect(url_for('dashboard'))
+
 @app.route('/dashboard')
 def dashboard():
     """Enhanced dashboard with better statistics and real-time updates"""
     try:
-        # Get comprehensive statistics
-        stats = transaction_manager.get_statistics()
-        
-        # Get spending data for different periods
-        week_spending = transaction_manager.get_spending_by_period('week')
-        month_spending = transaction_manager.get_spending_by_period('month')
-        quarter_spending = transaction_manager.get_spending_by_period('quarter')
-        
-        # Get roommate balances
-        balances = transaction_manager.calculate_balances()
-        
-        # Get parent account spending
-        parent_account_spending = {}
-        for parent_account in transaction_manager.parent_accounts.keys():
-            parent_account_spending[parent_account] = transaction_manager.get_parent_account_spending(parent_account)
+        # Statistics, period spending, balances and parent account spending in one pass
+        summary = transaction_manager.get_dashboard_summary()
         
         return render_template('dashboard.html',
-                             stats=stats,
-                             week_spending=week_spending,
-                             month_spending=month_spending,
-                             quarter_spending=quarter_spending,
-                             balances=balances,
-                             parent_account_spending=parent_account_spending,
+                             stats=summary['stats'],
+                             week_spending=summary['week_spending'],
+                             month_spending=summary['month_spending'],
+                             quarter_spending=summary['quarter_spending'],
+                             balances=summary['balances'],
+                             parent_account_spending=summary['parent_account_spending'],
                              parent_accounts=transaction_manager.parent_accounts)
     except Exception as e:
         flash(f"Error loading dashboard: {str(e)}", 'error')
@@ -93,7 +201,6 @@ def dashboard():
 @app.route('/upload', methods=['GET', 'POST'])
 def upload():
     """Enhanced upload page with better AI integration"""
-    global ai_transactions, extracted_texts
     
     if request.method == 'POST':
         action = request.form.get('action')
@@ -160,25 +267,19 @@ def upload():
                 file.save(filepath)
                 
                 try:
-                    transactions, errors = transaction_manager.parse_csv_transactions(filepath)
+                    # Stream the file straight into the store in validated batches
+                    summary = transaction_manager.import_csv_transactions(
+                        filepath, max_errors=10, workers=app.config['CSV_IMPORT_WORKERS'])
+                    print(f"CSV import: {summary['rows']} rows in {summary['seconds']}s "
+                          f"({summary['rows_per_second']} rows/sec, {summary['workers']} workers)")
                     
-                    if errors:
-                        for error in errors:
-                            flash(error, 'error')
+                    for error in summary['errors']:
+                        flash(error, 'error')
+                    if summary['error_count'] > len(summary['errors']):
+                        flash(f"...and {summary['error_count'] - len(summary['errors'])} more errors", 'error')
                     
-                    if transactions:
-                        # Add transactions to AI transactions for review
-                        for t_data in transactions:
-                            ai_transaction = AITransaction(
-                                date=t_data['date'],
-                                description=t_data['description'],
-                                amount=t_data['amount'],
-                                type=t_data['type'],
-                                parent_account=t_data['parent_account']
-                            )
-                            ai_transactions.append(ai_transaction)
-                        
-                        flash(f'Successfully loaded {len(transactions)} transactions from CSV', 'success')
+                    if summary['imported']:
+                        flash(f"Successfully imported {summary['imported']} of {summary['rows']} transactions from CSV", 'success')
                     else:
                         flash('No valid transactions found in CSV file', 'warning')
                 
@@ -248,23 +349,25 @@ def upload():
                     parent_account=parent_account
                 )
                 
-                # Add transaction (validation and defaults handled in add_transaction method)
-                if transaction_manager.add_transaction(transaction):
-                    transactions_to_add.append(transaction)
+                transactions_to_add.append(transaction)
+            
+            # Add all transactions with one save (validation and defaults handled in add_transactions)
+            results = transaction_manager.add_transactions(transactions_to_add)
+            for ai_transaction, transaction, result in zip(ai_transactions, transactions_to_add, results):
+                if result['success']:
                     transactions_to_remove.append(ai_transaction)
                 else:
-                    # Log the failure but continue processing other transactions
-                    print(f"Failed to add transaction: {transaction.description}")
-                    flash(f'Failed to add transaction: {transaction.description}', 'error')
+                    # Log the failure; the other rows are still added
+                    print(f"Failed to add transaction: {transaction.description} ({result['error']})")
+                    flash(f'Failed to add transaction: {transaction.description} ({result["error"]})', 'error')
             
             # Remove successfully added transactions from AI list
             for transaction in transactions_to_remove:
                 ai_transactions.remove(transaction)
             
             # Report results
-            total_attempted = len(ai_transactions) + len(transactions_to_add)
-            successful = len(transactions_to_add)
-            failed = total_attempted - successful
+            successful = len(transactions_to_remove)
+            failed = len(transactions_to_add) - successful
             
             if successful > 0:
                 flash(f'Successfully added {successful} transactions', 'success')
@@ -309,9 +412,7 @@ def plaid_link_token():
         if plaid_parser is None:
             plaid_parser = PlaidTransactionParser()
         
-        # Get user data from request
-        data = request.get_json()
-        user_id = data.get('user_id', 'luni_user')
+        user_id = current_household_id()
         
         # Create link token
         link_token_response = plaid_parser.client.link_token_create({
@@ -342,7 +443,7 @@ def plaid_exchange_token():
         
         data = request.get_json()
         public_token = data.get('public_token')
-        user_id = data.get('user_id', 'luni_user')
+        user_id = current_household_id()
         
         if not public_token:
             return jsonify({'error': 'Public token required'}), 400
@@ -403,7 +504,7 @@ def plaid_exchange_token():
 def plaid_get_connections():
     """Get all saved Plaid connections for the user"""
     try:
-        user_id = request.args.get('user_id', 'luni_user')
+        user_id = current_household_id()
         connections = storage_manager.load_plaid_connections(user_id)
         
         # Return only safe information (no access tokens)
@@ -434,7 +535,7 @@ def plaid_get_transactions():
             return jsonify({'error': 'Plaid not available'}), 500
         
         data = request.get_json()
-        user_id = data.get('user_id', 'luni_user')
+        user_id = current_household_id()
         days_back = data.get('days_back', 30)
         
         # Get active connection
@@ -457,8 +558,7 @@ def plaid_get_transactions():
         storage_manager.update_connection_usage(user_id, connection['item_id'])
         
         if transactions:
-            # Add to global plaid_transactions_list
-            global plaid_transactions_list
+            # Stage for review in this household's queue
             plaid_transactions_list.extend(transactions)
             
             return jsonify({
@@ -482,7 +582,7 @@ def plaid_disconnect():
     """Disconnect a Plaid connection"""
     try:
         data = request.get_json()
-        user_id = data.get('user_id', 'luni_user')
+        user_id = current_household_id()
         item_id = data.get('item_id')
         
         if not item_id:
@@ -506,7 +606,7 @@ def plaid_disconnect():
 @app.route('/plaid_transactions', methods=['GET', 'POST'])
 def plaid_transactions():
     """Plaid Transactions page for automatic bank transaction retrieval"""
-    global plaid_transactions_list, plaid_parser
+    global plaid_parser
     
     # Check if Plaid is available
     if not PLAID_AVAILABLE:
@@ -522,7 +622,7 @@ def plaid_transactions():
                              parsing_stats={})
     
     # Get saved connections for the user
-    user_id = 'luni_user'  # You can make this dynamic based on session
+    user_id = current_household_id()
     saved_connections = storage_manager.load_plaid_connections(user_id)
     
     # Initialize Plaid parser if not already done
@@ -578,7 +678,7 @@ def plaid_transactions():
                     new_transactions = plaid_parser.get_recent_transactions(access_token, days_back)
                     
                     if new_transactions:
-                        # Add to global plaid_transactions list
+                        # Stage for review in this household's queue
                         plaid_transactions_list.extend(new_transactions)
                         flash(f'Successfully retrieved {len(new_transactions)} transactions from Plaid', 'success')
                     else:
@@ -634,23 +734,25 @@ def plaid_transactions():
                     parent_account=parent_account
                 )
                 
-                # Add transaction (validation and defaults handled in add_transaction method)
-                if transaction_manager.add_transaction(transaction):
-                    transactions_to_add.append(transaction)
+                transactions_to_add.append(transaction)
+            
+            # Add all transactions with one save (validation and defaults handled in add_transactions)
+            results = transaction_manager.add_transactions(transactions_to_add)
+            for plaid_transaction, transaction, result in zip(plaid_transactions_list, transactions_to_add, results):
+                if result['success']:
                     transactions_to_remove.append(plaid_transaction)
                 else:
-                    # Log the failure but continue processing other transactions
-                    print(f"Failed to add Plaid transaction: {transaction.description}")
-                    flash(f'Failed to add transaction: {transaction.description}', 'error')
+                    # Log the failure; the other rows are still added
+                    print(f"Failed to add Plaid transaction: {transaction.description} ({result['error']})")
+                    flash(f'Failed to add transaction: {transaction.description} ({result["error"]})', 'error')
             
             # Remove successfully added transactions from Plaid list
             for transaction in transactions_to_remove:
                 plaid_transactions_list.remove(transaction)
             
             # Report results
-            total_attempted = len(plaid_transactions_list) + len(transactions_to_add)
-            successful = len(transactions_to_add)
-            failed = total_attempted - successful
+            successful = len(transactions_to_remove)
+            failed = len(transactions_to_add) - successful
             
             if successful > 0:
                 flash(f'Successfully added {successful} transactions', 'success')
@@ -679,9 +781,8 @@ def plaid_transactions():
                          all_sub_accounts=transaction_manager.get_all_sub_accounts(),
                          parsing_stats=parsing_stats)
 
-@app.route('/all_transactions')
-def all_transactions():
-    """Enhanced all transactions page with better filtering"""
+def transaction_filters_from_request():
+    """Build filter_transactions() filters from the query string; returns (filters, period)"""
     # Get filter parameters
     filters = {}
     for field in ['date', 'description', 'who_paid', 'account', 'method_of_payment', 'type', 'parent_account', 'who_will_use']:
@@ -721,18 +822,34 @@ def all_transactions():
     if end_date:
         filters['end_date'] = end_date
     
-    # Get filtered transactions
-    filtered_transactions = transaction_manager.filter_transactions(filters)
+    return filters, period
+
+def encode_cursor(cursor):
+    """Query-string form of a (date, id) page cursor"""
+    return f"{cursor[0]}|{cursor[1]}" if cursor else None
+
+def decode_cursor(value):
+    """(date, id) page cursor from its query-string form, or None"""
+    if not value or '|' not in value:
+        return None
+    return tuple(value.split('|', 1))
+
+@app.route('/all_transactions')
+def all_transactions():
+    """Enhanced all transactions page with better filtering"""
+    filters, period = transaction_filters_from_request()
     
-    # Sort by date (newest first)
-    filtered_transactions.sort(key=lambda x: x.date, reverse=True)
+    # First page only, newest first; later pages come from /api/transactions as the user scrolls
+    page, next_cursor = transaction_manager.page_transactions(filters, app.config['TRANSACTIONS_PAGE_SIZE'])
     
-    # Calculate spending overview and roommate breakdown server-side
-    spending_overview = transaction_manager.calculate_spending_overview(filtered_transactions)
+    # Totals cover the full filtered set, not just the rendered page (vectorized when NumPy is available)
+    spending_overview = transaction_manager.calculate_spending_overview(filters=filters)
+    filtered_transactions = transaction_manager.filter_transactions(filters)
     roommate_breakdown = transaction_manager.calculate_roommate_breakdown(filtered_transactions)
     
     return render_template('all_transactions.html',
-                         transactions=filtered_transactions,
+                         transactions=page,
+                         next_cursor=encode_cursor(next_cursor),
                          filters=filters,
                          selected_period=period or 'month',  # Default to month if no period specified
                          roommates=transaction_manager.roommates,
@@ -743,6 +860,29 @@ def all_transactions():
                          spending_overview=spending_overview,
                          roommate_breakdown=roommate_breakdown)
 
+@app.route('/api/transactions')
+def api_transactions():
+    """Next page of /all_transactions for infinite scroll: ?cursor=<date|id>&limit=N plus the page filters"""
+    try:
+        filters, _ = transaction_filters_from_request()
+        limit = min(max(request.args.get('limit', app.config['TRANSACTIONS_PAGE_SIZE'], type=int), 1),
+                    MAX_PAGE_SIZE)
+        page, next_cursor = transaction_manager.page_transactions(
+            filters, limit, decode_cursor(request.args.get('cursor')))
+        
+        return jsonify({
+            'transactions': [transaction.to_dict() for transaction in page],
+            'html': render_template('_transaction_rows.html',
+                                    transactions=page,
+                                    roommates=transaction_manager.roommates,
+                                    payment_methods=transaction_manager.payment_methods,
+                                    parent_accounts=transaction_manager.parent_accounts),
+            'next_cursor': encode_cursor(next_cursor)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/information', methods=['GET', 'POST'])
 def information():
     """Enhanced information management page"""
@@ -923,18 +1063,13 @@ def save_all_changes():
         # Get the updated transactions from the request
         updated_transactions = request.get_json().get('transactions', [])
         
-        success_count = 0
-        error_count = 0
-        
-        for transaction_data in updated_transactions:
-            transaction_id = transaction_data.get('id')
-            if transaction_id:
-                # Remove id from the data before updating
-                update_data = {k: v for k, v in transaction_data.items() if k != 'id'}
-                if transaction_manager.update_transaction(transaction_id, **update_data):
-                    success_count += 1
-                else:
-                    error_count += 1
+        # Validate and apply every row, then save once
+        results = transaction_manager.update_transactions(
+            [transaction_data for transaction_data in updated_transactions if transaction_data.get('id')]
+        )
+        failures = [{'id': result['id'], 'error': result['error']} for result in results if not result['success']]
+        success_count = len(results) - len(failures)
+        error_count = len(failures)
         
         if error_count == 0:
             return jsonify({
@@ -944,7 +1079,8 @@ def save_all_changes():
         else:
             return jsonify({
                 'success': False, 
-                'message': f'Updated {success_count} transactions, {error_count} failed'
+                'message': f'Updated {success_count} transactions, {error_count} failed',
+                'failures': failures
             })
             
     except Exception as e:
@@ -952,42 +1088,62 @@ def save_all_changes():
 
 @app.route('/export_transactions')
 def export_transactions():
-    """Export transactions to CSV"""
+    """Stream transactions as CSV, honoring the /all_transactions filters"""
     try:
-        transactions = transaction_manager.transactions
-        
-        # Create CSV content
-        csv_content = "Date,Description,Amount,Account,Who Paid,Who Will Use,Method of Payment,Type,Parent Account\n"
-        
-        for transaction in transactions:
-            csv_content += f"{transaction.date},{transaction.description},{transaction.amount},{transaction.account},{transaction.who_paid},{transaction.who_will_use},{transaction.method_of_payment},{transaction.type},{transaction.parent_account}\n"
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
-            f.write(csv_content)
-            temp_file = f.name
-        
-        return send_file(temp_file, as_attachment=True, download_name='transactions.csv')
-    
+        filters, _ = transaction_filters_from_request()
+        transactions = transaction_manager.filter_transactions(filters)
     except Exception as e:
         flash(f'Error exporting transactions: {str(e)}', 'error')
         return redirect(url_for('all_transactions'))
+    
+    # Rows are written as the client reads them instead of building the file in memory
+    return Response(stream_with_context(iter_csv_export(transactions)), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=transactions.csv'})
+
+@app.route('/api/export/<export_format>')
+def api_export(export_format):
+    """Typed export for analysis jobs: jsonl always, parquet/arrow with pyarrow; ?since=<X-Next-Since> for increments"""
+    if export_format not in available_formats():
+        return jsonify({'error': f'Unsupported export format: {export_format}',
+                        'available_formats': available_formats()}), 400
+    
+    try:
+        chunks, next_since, full = transaction_manager.export_analytics(export_format, request.args.get('since') or None)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    # X-Export-Full: every transaction, sent when there was no cursor or the store was reloaded since
+    headers = {'Content-Disposition': f'attachment; filename=transactions.{export_format}',
+               'X-Next-Since': next_since,
+               'X-Export-Full': 'true' if full else 'false'}
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format], headers=headers)
 
 @app.route('/api/statistics')
 def api_statistics():
-    """API endpoint for real-time statistics"""
+    """API endpoint for real-time statistics; polls with a current If-None-Match get 304 without recomputing"""
     try:
-        stats = transaction_manager.get_statistics()
-        balances = transaction_manager.calculate_balances()
-        week_spending = transaction_manager.get_spending_by_period('week')
-        month_spending = transaction_manager.get_spending_by_period('month')
+        # This household's persistence status changes without data writes (flushes) and is cheap
+        # to read, so it is read on every poll and folded into the ETag with the data version
+        persistence = transaction_manager.get_persistence_status()
+        status_key = zlib.crc32(json.dumps(persistence, sort_keys=True).encode('utf-8'))
+        etag = f"{transaction_manager.summary_version()}-{status_key:08x}"
         
-        return jsonify({
-            'stats': stats,
-            'balances': balances,
-            'week_spending': week_spending,
-            'month_spending': month_spending
-        })
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            summary = transaction_manager.get_dashboard_summary(periods=('week', 'month'))
+            response = jsonify({
+                'stats': summary['stats'],
+                'balances': summary['balances'],
+                'week_spending': summary['week_spending'],
+                'month_spending': summary['month_spending'],
+                'persistence': persistence
+            })
+        
+        # Browsers revalidate every poll, so fetch() sends If-None-Match on its own
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
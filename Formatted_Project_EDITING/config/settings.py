@@ -7,11 +7,15 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv(override=True)
 
+# Secret keys published with the code (the built-in default and the .env.example placeholder);
+# sessions signed with these can be forged, so household access codes stay disabled under them
+PUBLIC_SECRET_KEYS = ('luni-web-enhanced-secret-key-2024', 'your-secret-key-here')
+
 class Config:
     """Base configuration class."""
     
     # Flask settings
-    SECRET_KEY = os.getenv('SECRET_KEY', 'luni-web-enhanced-secret-key-2024')
+    SECRET_KEY = os.getenv('SECRET_KEY', PUBLIC_SECRET_KEYS[0])
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
     
     # API Keys
@@ -28,6 +32,47 @@ class Config:
     
     # Data files
     TRANSACTIONS_FILE = 'transactions.json'
+    TRANSACTIONS_DB = os.getenv('TRANSACTIONS_DB', 'transactions.db')
+    
+    # Storage backend for transactions: 'json' or 'sqlite' (migrates TRANSACTIONS_FILE on first start)
+    TRANSACTIONS_BACKEND = os.getenv('TRANSACTIONS_BACKEND', 'json').lower()
+    
+    # Append mutations to a journal instead of rewriting TRANSACTIONS_FILE on every change
+    TRANSACTIONS_JOURNAL = os.getenv('TRANSACTIONS_JOURNAL', 'False').lower() == 'true'
+    JOURNAL_COMPACT_THRESHOLD = int(os.getenv('JOURNAL_COMPACT_THRESHOLD', '500'))
+    
+    # Data file encoding for the json backend: 'json' (portable) or 'binary' (compressed snapshot)
+    TRANSACTIONS_SNAPSHOT_FORMAT = os.getenv('TRANSACTIONS_SNAPSHOT_FORMAT', 'json').lower()
+    
+    # Seconds a background writer may delay saves to group them (0 saves inside each request)
+    TRANSACTIONS_WRITE_BEHIND_INTERVAL = float(os.getenv('TRANSACTIONS_WRITE_BEHIND_INTERVAL', '0'))
+    
+    # Coordinate several worker processes through a lock file and change detection (POSIX only)
+    TRANSACTIONS_MULTIPROCESS = os.getenv('TRANSACTIONS_MULTIPROCESS', 'False').lower() == 'true'
+    
+    # Build transaction objects and indexes in a background thread at startup
+    TRANSACTIONS_BACKGROUND_LOAD = os.getenv('TRANSACTIONS_BACKGROUND_LOAD', 'True').lower() == 'true'
+    
+    # Transactions rendered per page of /all_transactions (more load as the user scrolls)
+    TRANSACTIONS_PAGE_SIZE = int(os.getenv('TRANSACTIONS_PAGE_SIZE', '100'))
+    
+    # Processes parsing large CSV imports in parallel (0 parses in the request thread)
+    CSV_IMPORT_WORKERS = int(os.getenv('CSV_IMPORT_WORKERS', '0'))
+    
+    # Per-household workspaces: the default household uses TRANSACTIONS_FILE / TRANSACTIONS_DB,
+    # others get WORKSPACES_DIR/<household id>/; idle ones are evicted past either limit
+    DEFAULT_HOUSEHOLD = os.getenv('DEFAULT_HOUSEHOLD', 'luni_user')
+    WORKSPACES_DIR = os.getenv('WORKSPACES_DIR', 'workspaces')
+    WORKSPACES_MAX_LOADED = int(os.getenv('WORKSPACES_MAX_LOADED', '64'))
+    WORKSPACES_MEMORY_BUDGET_MB = int(os.getenv('WORKSPACES_MEMORY_BUDGET_MB', '256'))
+    
+    # Households a session may switch to, as "household:code,household:code"; switching posts the code.
+    # Ignored unless SECRET_KEY is set to a private value
+    WORKSPACE_ACCESS_CODES = dict(
+        (household.strip(), code.strip())
+        for household, _, code in (entry.partition(':') for entry in os.getenv('WORKSPACE_ACCESS_CODES', '').split(','))
+        if household.strip() and code.strip()
+    )
     
     @staticmethod
     def init_app(app):
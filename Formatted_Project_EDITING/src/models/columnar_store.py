@@ -0,0 +1,238 @@
+"""
+Columnar mirror of the transaction set for analytics
+Amounts are stored as int64 cents, dates as int32 ordinals and categorical
+fields as dictionary-encoded int32 codes, so spending rollups run as NumPy
+reductions instead of Python loops. Requires NumPy; callers fall back to the
+pure-Python path when NUMPY_AVAILABLE is False
+"""
+
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Dictionary-encoded columns (every exact-match filter field)
+CATEGORICAL_COLUMNS = ('account', 'parent_account', 'who_paid', 'type', 'method_of_payment')
+
+# Ordinal stored for dates that cannot be parsed
+INVALID_DATE = -1
+
+
+def date_ordinal(value: str) -> int:
+    """Ordinal of a YYYY-MM-DD date, or INVALID_DATE"""
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return INVALID_DATE
+
+
+class ColumnarTransactionStore:
+    """Append-friendly columnar copy of the transactions kept in sync by the manager"""
+
+    # Compact once this fraction of rows are deleted or superseded
+    COMPACT_DEAD_RATIO = 0.5
+
+    def __init__(self):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy is required for ColumnarTransactionStore")
+
+        self.amount_cents = np.zeros(0, dtype=np.int64)
+        self.date_ordinal = np.zeros(0, dtype=np.int32)
+        self.codes = {column: np.zeros(0, dtype=np.int32) for column in CATEGORICAL_COLUMNS}
+        self.alive = np.zeros(0, dtype=bool)
+
+        # Dictionary encoding: column -> value -> code, and column -> code -> value
+        self._code_of: Dict[str, Dict[str, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+        self.categories: Dict[str, List[str]] = {column: [] for column in CATEGORICAL_COLUMNS}
+
+        self._row_of: Dict[str, int] = {}   # transaction id -> row
+        self._row_ids: List[Optional[str]] = []
+        self._pending: List[Tuple] = []     # rows added since the last flush
+        self._killed: List[int] = []        # rows removed since the last flush
+        self._dead = 0
+
+        # Queries flush under the manager's shared read lock, so concurrent readers take turns
+        # here; the first folds the staged rows in and the rest find nothing left to do
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _encode(self, column: str, value) -> int:
+        code_of = self._code_of[column]
+        code = code_of.get(value)
+        if code is None:
+            code = len(self.categories[column])
+            code_of[value] = code
+            self.categories[column].append(value)
+        return code
+
+    def code(self, column: str, value) -> int:
+        """Code for a categorical value, or -1 if it never occurs"""
+        return self._code_of[column].get(value, -1)
+
+    def add(self, transaction, date_key: str):
+        """Stage a transaction as a new row"""
+        try:
+            cents = int(round(float(transaction.amount) * 100))
+        except (TypeError, ValueError):
+            cents = 0
+
+        self._row_of[transaction.id] = len(self._row_ids)
+        self._row_ids.append(transaction.id)
+        self._pending.append(
+            (cents, date_ordinal(date_key)) +
+            tuple(self._encode(column, getattr(transaction, column)) for column in CATEGORICAL_COLUMNS)
+        )
+
+    def remove(self, transaction_id: str):
+        """Mark a transaction's row as deleted"""
+        row = self._row_of.pop(transaction_id, None)
+        if row is not None:
+            self._row_ids[row] = None
+            self._killed.append(row)
+            self._dead += 1
+
+    def _flush(self):
+        """Fold staged rows and deletions into the arrays"""
+        with self._flush_lock:
+            self._flush_staged()
+
+    def _flush_staged(self):
+        if self._pending:
+            columns = list(zip(*self._pending))
+            self.amount_cents = np.concatenate([self.amount_cents, np.array(columns[0], dtype=np.int64)])
+            self.date_ordinal = np.concatenate([self.date_ordinal, np.array(columns[1], dtype=np.int32)])
+            for offset, column in enumerate(CATEGORICAL_COLUMNS, start=2):
+                self.codes[column] = np.concatenate(
+                    [self.codes[column], np.array(columns[offset], dtype=np.int32)]
+                )
+            self.alive = np.concatenate([self.alive, np.ones(len(self._pending), dtype=bool)])
+            self._pending = []
+
+        if self._killed:
+            self.alive[np.array(self._killed, dtype=np.int64)] = False
+            self._killed = []
+
+        if self._row_ids and self._dead > len(self._row_ids) * self.COMPACT_DEAD_RATIO:
+            self._compact()
+
+    def _compact(self):
+        """Drop dead rows and renumber the live ones"""
+        keep = self.alive
+        self.amount_cents = self.amount_cents[keep]
+        self.date_ordinal = self.date_ordinal[keep]
+        for column in CATEGORICAL_COLUMNS:
+            self.codes[column] = self.codes[column][keep]
+        self.alive = np.ones(int(keep.sum()), dtype=bool)
+
+        self._row_ids = [transaction_id for transaction_id in self._row_ids if transaction_id is not None]
+        self._row_of = {transaction_id: row for row, transaction_id in enumerate(self._row_ids)}
+        self._dead = 0
+
+    def _mask(self, type_value: str = None, start_date: str = None, end_date: str = None,
+              **equals) -> "np.ndarray":
+        """Boolean mask of live rows matching a type, date range and categorical values"""
+        self._flush()
+        mask = self.alive.copy()
+        if type_value is not None:
+            mask &= self.codes['type'] == self.code('type', type_value)
+        if start_date:
+            mask &= self.date_ordinal >= date_ordinal(start_date)
+        if end_date:
+            mask &= self.date_ordinal <= date_ordinal(end_date)
+            mask &= self.date_ordinal != INVALID_DATE
+        for column, value in equals.items():
+            mask &= self.codes[column] == self.code(column, value)
+        return mask
+
+    def filter_mask(self, start_date: str = None, end_date: str = None,
+                    transaction_ids: Optional[Iterable[str]] = None, **equals) -> "np.ndarray":
+        """Mask of live rows in a date range, matching categorical values and, if given, one of transaction_ids"""
+        mask = self._mask(None, start_date, end_date, **equals)
+        if transaction_ids is not None:
+            # Rows are stable after the flush in _mask (writers are excluded while queries run)
+            listed = np.zeros(len(mask), dtype=bool)
+            listed[np.array([self._row_of[i] for i in transaction_ids if i in self._row_of], dtype=np.int64)] = True
+            mask &= listed
+        return mask
+
+    def row_ids(self, mask) -> List[str]:
+        """Transaction ids of the rows selected by a mask"""
+        return [self._row_ids[row] for row in np.flatnonzero(mask).tolist()]
+
+    def _grouped(self, column: str, mask) -> Dict[str, Tuple[float, int]]:
+        """Sum of amounts and row count per value of a categorical column"""
+        codes = self.codes[column][mask]
+        if not len(codes):
+            return {}
+        size = len(self.categories[column])
+        totals = np.bincount(codes, weights=self.amount_cents[mask], minlength=size)
+        counts = np.bincount(codes, minlength=size)
+        return {
+            self.categories[column][code]: (float(totals[code]) / 100, int(counts[code]))
+            for code in np.flatnonzero(counts)
+        }
+
+    def spending_overview(self, mask=None) -> Dict:
+        """Total spent, total income and count over the rows of a filter_mask (all live rows by default)"""
+        if mask is None:
+            self._flush()
+            mask = self.alive
+        amounts = self.amount_cents[mask]
+        types = self.codes['type'][mask]
+        return {
+            'total_spent': float(amounts[types == self.code('type', 'expense')].sum()) / 100,
+            'total_income': float(amounts[types == self.code('type', 'income')].sum()) / 100,
+            'transaction_count': int(len(amounts))
+        }
+
+    def sub_account_spending(self, parent_account: str, start_date: str = None, end_date: str = None) -> Dict:
+        """Expense totals per sub-account of one parent account"""
+        mask = self._mask('expense', start_date, end_date, parent_account=parent_account)
+        grouped = self._grouped('account', mask)
+        return {
+            'total': float(self.amount_cents[mask].sum()) / 100,
+            'by_sub_account': {account: total for account, (total, _) in grouped.items()},
+            'transaction_count': int(mask.sum())
+        }
+
+    def all_sub_account_spending(self, parent_accounts) -> Dict[str, Dict]:
+        """Expense totals per sub-account for every parent account in one reduction"""
+        mask = self._mask('expense')
+        accounts = len(self.categories['account']) or 1
+        pair_codes = self.codes['parent_account'][mask].astype(np.int64) * accounts + self.codes['account'][mask]
+        amounts = self.amount_cents[mask]
+
+        result = {parent: {'total': 0, 'by_sub_account': {}, 'transaction_count': 0}
+                  for parent in parent_accounts}
+        if not len(pair_codes):
+            return result
+
+        pairs, inverse = np.unique(pair_codes, return_inverse=True)
+        totals = np.bincount(inverse, weights=amounts)
+        counts = np.bincount(inverse)
+        for pair, total, count in zip(pairs.tolist(), totals.tolist(), counts.tolist()):
+            parent = result.get(self.categories['parent_account'][pair // accounts])
+            if parent is None:
+                continue
+            parent['total'] += total / 100
+            parent['transaction_count'] += count
+            parent['by_sub_account'][self.categories['account'][pair % accounts]] = total / 100
+        return result
+
+    def period_spending(self, start_date: str, end_date: str) -> Dict:
+        """Expense totals per payer between two dates"""
+        mask = self._mask('expense', start_date, end_date)
+        grouped = self._grouped('who_paid', mask)
+        return {
+            'total_spending': float(self.amount_cents[mask].sum()) / 100,
+            'by_person': {person: total for person, (total, _) in grouped.items()},
+            'transaction_count': int(mask.sum())
+        }
@@ -0,0 +1,775 @@
+"""
+Storage backends for EnhancedTransactionManager
+The JSON file backend keeps the original transactions.json layout (with an
+optional append-only journal); the SQLite backend stores one row per
+transaction and answers filter, spending and balance queries in SQL
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+from src.utils.snapshot_codec import SNAPSHOT_FORMATS, decode_snapshot, describe_format, encode_snapshot
+from src.utils.transaction_journal import TransactionJournal
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Columns of a stored transaction, in transactions.json field order
+TRANSACTION_FIELDS = [
+    'date', 'description', 'amount', 'account', 'who_paid', 'who_will_use',
+    'method_of_payment', 'type', 'parent_account', 'id', 'created_at', 'updated_at'
+]
+
+# Non-transaction sections of the data file
+SETTINGS_KEYS = ['roommates', 'parent_accounts', 'payment_methods', 'default_person', 'metadata']
+
+# Exact-match filters supported by filter_transactions
+EXACT_FILTER_FIELDS = ['who_paid', 'account', 'method_of_payment', 'type', 'parent_account']
+
+# Date formats seen from CSV imports and the AI parser, tried after ISO
+DATE_INPUT_FORMATS = ['%m/%d/%Y', '%m-%d-%Y', '%m/%d/%y', '%Y/%m/%d', '%d.%m.%Y']
+
+
+def normalize_date(value: str) -> str:
+    """Normalize a transaction date to YYYY-MM-DD so dates sort and compare correctly"""
+    value = (value or '').strip()
+    if len(value) >= 10 and value[4] == '-' and value[7] == '-':
+        return value[:10]
+    for date_format in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return value
+
+
+def parse_participants(who_will_use: str) -> Tuple[str, ...]:
+    """Split a comma-separated who_will_use value into names"""
+    return tuple(user.strip() for user in (who_will_use or '').split(',') if user.strip())
+
+
+def expand_batches(records: List[Dict]):
+    """Yield records with batch records unpacked in place"""
+    for record in records:
+        if record.get('op') == 'batch':
+            yield from record.get('records', [])
+        else:
+            yield record
+
+
+def file_key(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class StorageBackend:
+    """Base class for transaction store persistence"""
+
+    # Backends that answer filter/spending/balance queries themselves set this
+    supports_queries = False
+
+    # Set when several processes share the store and coordinate through a lock file
+    shared = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self._process_lock_fd: Optional[int] = None
+        self._process_lock_depth = 0
+
+    def _init_shared(self, shared: bool):
+        if shared and fcntl is None:
+            raise RuntimeError("Multi-process mode needs fcntl file locks (POSIX only)")
+        self.shared = shared
+
+    def acquire_process_lock(self, exclusive: bool = True):
+        """Take the cross-process lock file; reentrant, and a no-op unless shared"""
+        if not self.shared:
+            return
+        if not self._process_lock_depth:
+            if self._process_lock_fd is None:
+                self._process_lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._process_lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._process_lock_depth += 1
+
+    def release_process_lock(self):
+        """Release one level of the cross-process lock"""
+        if not self._process_lock_depth:
+            return
+        self._process_lock_depth -= 1
+        if not self._process_lock_depth:
+            fcntl.flock(self._process_lock_fd, fcntl.LOCK_UN)
+
+    def bind_state_lock(self, state_lock: Callable[[], ContextManager]):
+        """Receive the owner's shared lock, for backends that capture owner state from their own threads"""
+
+    def has_external_changes(self) -> bool:
+        """Cheap check whether another process changed the store since we last read or wrote it"""
+        return False
+
+    def poll_changes(self) -> Tuple[bool, List[Dict]]:
+        """
+        Collect changes other processes made since we last read or wrote the store
+
+        Returns:
+            (reload, records): reload is True when only a full reload can catch up,
+            otherwise records holds the journal records to apply
+        """
+        return False, []
+
+    def load(self) -> Optional[Dict]:
+        """Load the store in transactions.json layout, or None if it does not exist"""
+        raise NotImplementedError
+
+    def commit(self, records: List[Dict], snapshot_source: Callable[[], Callable[[], Dict]]):
+        """
+        Persist mutation records
+
+        Args:
+            records: Journal-style records ({'op': 'put'|'delete'|'settings', ...})
+            snapshot_source: Captures current state and returns a builder for the full document
+        """
+        raise NotImplementedError
+
+    def save_snapshot(self, data: Dict):
+        """Replace the whole store with a transactions.json style document"""
+        raise NotImplementedError
+
+    def compact(self, snapshot_source: Callable[[], Callable[[], Dict]], background: bool = True) -> bool:
+        """Fold pending incremental writes into the main store"""
+        return False
+
+    def size_bytes(self) -> int:
+        """Size of the store on disk"""
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def flush(self) -> bool:
+        """Make every committed record durable, returning False if that failed"""
+        return True
+
+    def flush_status(self) -> Dict:
+        """Pending write state; synchronous backends never lag"""
+        return {'mode': 'sync', 'pending_records': 0, 'flush_lag_seconds': 0.0,
+                'last_flush_at': None, 'last_error': None}
+
+    def close(self):
+        """Release any open resources"""
+        if self._process_lock_fd is not None:
+            os.close(self._process_lock_fd)
+            self._process_lock_fd = None
+
+
+class JSONStorageBackend(StorageBackend):
+    """transactions.json file (plain JSON or binary snapshot), optionally fronted by an append-only journal"""
+
+    def __init__(self, data_file: str = "transactions.json", use_journal: bool = False,
+                 journal_compact_threshold: int = 500, snapshot_format: str = 'json',
+                 shared: bool = False):
+        super().__init__(data_file)
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        self.snapshot_format = snapshot_format
+        self._init_shared(shared)
+
+        # What this process last read or wrote, to spot changes made by others
+        self._seen_snapshot: Optional[Tuple[int, int, int]] = None
+        self._seen_journal: Tuple[Optional[int], int] = (None, 0)  # (inode, byte offset)
+        self.journal: Optional[TransactionJournal] = None
+        if use_journal:
+            self.journal = TransactionJournal(f"{data_file}.journal", journal_compact_threshold)
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[Dict]:
+        self.acquire_process_lock(exclusive=False)
+        try:
+            data = None
+            if os.path.exists(self.path):
+                # Plain JSON and binary snapshots are told apart by the file header
+                with open(self.path, 'rb') as f:
+                    data = decode_snapshot(f.read())
+
+            if self.journal:
+                records = self.journal.read_records()
+                if records:
+                    data = self._apply_journal(data or {}, records)
+
+            self._mark_seen()
+            return data
+        finally:
+            self.release_process_lock()
+
+    def _journal_key(self) -> Tuple[Optional[int], int]:
+        key = file_key(self.journal.journal_file)
+        return (key[0], key[2]) if key else (None, 0)
+
+    def _mark_seen(self):
+        """Record the current files as this process's view of the store"""
+        self._seen_snapshot = file_key(self.path)
+        if self.journal:
+            self._seen_journal = self._journal_key()
+
+    def has_external_changes(self) -> bool:
+        if file_key(self.path) != self._seen_snapshot:
+            return True
+        return bool(self.journal) and self._journal_key() != self._seen_journal
+
+    def poll_changes(self) -> Tuple[bool, List[Dict]]:
+        self.acquire_process_lock(exclusive=False)
+        try:
+            if file_key(self.path) != self._seen_snapshot:
+                return True, []
+            if not self.journal:
+                return False, []
+
+            inode, size = self._journal_key()
+            seen_inode, offset = self._seen_journal
+            if (seen_inode is not None and inode != seen_inode) or size < offset:
+                # The journal was rotated or rewritten; only a full reload is safe
+                return True, []
+            if size == offset:
+                return False, []
+
+            # Delta reload: only the records other processes appended since our last read
+            records, offset = self.journal.read_from(offset)
+            self._seen_journal = (inode, offset)
+            return False, records
+        finally:
+            self.release_process_lock()
+
+    def _apply_journal(self, data: Dict, records: List[Dict]) -> Dict:
+        """Apply journal records written since the last snapshot"""
+        transactions = data.get('transactions', [])
+        positions = {t.get('id'): i for i, t in enumerate(transactions)}
+        deleted = set()
+
+        for record in expand_batches(records):
+            op = record.get('op')
+            try:
+                if op == 'put':
+                    t_data = record['transaction']
+                    deleted.discard(t_data['id'])
+                    if t_data['id'] in positions:
+                        transactions[positions[t_data['id']]] = t_data
+                    else:
+                        positions[t_data['id']] = len(transactions)
+                        transactions.append(t_data)
+                elif op == 'delete':
+                    deleted.add(record['id'])
+                elif op == 'settings':
+                    data.update(record['settings'])
+                else:
+                    print(f"Warning: Skipping unknown journal operation: {op}")
+            except Exception as e:
+                print(f"Warning: Skipping invalid journal record: {e}")
+
+        if deleted:
+            transactions = [t for t in transactions if t.get('id') not in deleted]
+        data['transactions'] = transactions
+        return data
+
+    def commit(self, records, snapshot_source):
+        if self.journal is None:
+            self.save_snapshot(snapshot_source()())
+            return
+
+        if len(records) > 1:
+            # One journal line per commit, so a torn write drops the whole batch or none of it
+            records = [{'op': 'batch', 'records': records}]
+        self.journal.append(records)
+        if self.shared:
+            self._seen_journal = self._journal_key()
+        if self.journal.needs_compaction():
+            self.compact(snapshot_source)
+
+    def save_snapshot(self, data: Dict):
+        """Write the data file atomically via a temp file and rename"""
+        metadata = dict(data.get('metadata') or {}, snapshot_format=describe_format(self.snapshot_format))
+        payload = encode_snapshot(dict(data, metadata=metadata), self.snapshot_format)
+
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.path)
+        if self.shared:
+            self._seen_snapshot = file_key(self.path)
+
+    def compact(self, snapshot_source, background=True):
+        if self.journal is None:
+            return False
+
+        # Other processes must never see a rotated journal without its snapshot
+        background = background and not self.shared
+
+        with self._lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return False
+
+            # Capture state and rotate the journal together so no record is lost;
+            # records appended after this point land in the new journal
+            build_snapshot = snapshot_source()
+            self.journal.rotate()
+
+            if background:
+                self._compaction_thread = threading.Thread(
+                    target=self._run_compaction, args=(build_snapshot,), daemon=True
+                )
+                self._compaction_thread.start()
+            else:
+                self._run_compaction(build_snapshot)
+        return True
+
+    def _run_compaction(self, build_snapshot: Callable[[], Dict]):
+        try:
+            self.save_snapshot(build_snapshot())
+            self.journal.finish_compaction()
+            if self.shared:
+                self._mark_seen()
+        except Exception as e:
+            # The rotated journal is kept and replayed on the next load
+            print(f"Error compacting journal: {e}")
+
+    def wait_for_compaction(self):
+        """Block until a running background compaction finishes"""
+        if self._compaction_thread:
+            self._compaction_thread.join()
+
+
+class SQLiteStorageBackend(StorageBackend):
+    """SQLite database with indexed transaction rows and SQL query pushdown"""
+
+    supports_queries = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            date TEXT NOT NULL,
+            description TEXT NOT NULL,
+            amount REAL NOT NULL,
+            account TEXT,
+            who_paid TEXT,
+            who_will_use TEXT,
+            method_of_payment TEXT,
+            type TEXT,
+            parent_account TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            participant_count INTEGER NOT NULL DEFAULT 0,
+            date_key TEXT
+        );
+        CREATE TABLE IF NOT EXISTS transaction_participants (
+            transaction_id TEXT NOT NULL REFERENCES transactions(id) ON DELETE CASCADE,
+            person TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_who_paid ON transactions(who_paid);
+        CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account);
+        CREATE INDEX IF NOT EXISTS idx_transactions_parent_account ON transactions(parent_account);
+        CREATE INDEX IF NOT EXISTS idx_participants_transaction ON transaction_participants(transaction_id);
+        CREATE INDEX IF NOT EXISTS idx_participants_person ON transaction_participants(person);
+    """
+
+    def __init__(self, db_file: str = "transactions.db", shared: bool = False):
+        super().__init__(db_file)
+        self._init_shared(shared)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate_date_key()
+        self._conn.commit()
+        self._data_version = self._read_data_version()
+
+    def _migrate_date_key(self):
+        """Add and fill the normalized date_key column on databases created before it existed"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(transactions)")}
+        if 'date_key' not in columns:
+            self._conn.execute("ALTER TABLE transactions ADD COLUMN date_key TEXT")
+        rows = self._conn.execute("SELECT id, date FROM transactions WHERE date_key IS NULL").fetchall()
+        self._conn.executemany("UPDATE transactions SET date_key = ? WHERE id = ?",
+                               [(normalize_date(row['date']), row['id']) for row in rows])
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_key ON transactions(date_key, id)")
+
+    def _read_data_version(self) -> int:
+        """SQLite's counter of commits made by other connections"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_external_changes(self) -> bool:
+        return self._read_data_version() != self._data_version
+
+    def poll_changes(self) -> Tuple[bool, List[Dict]]:
+        # Rows are shared through the database itself; reload the in-memory copy when it moved
+        return self.has_external_changes(), []
+
+    def load(self) -> Optional[Dict]:
+        with self._lock:
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            settings = {row['key']: json.loads(row['value'])
+                        for row in self._conn.execute("SELECT key, value FROM settings")}
+            rows = self._conn.execute(
+                f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions ORDER BY rowid"
+            ).fetchall()
+
+        if not settings and not rows:
+            return None
+
+        data = {'transactions': [dict(row) for row in rows]}
+        data.update(settings)
+        return data
+
+    def _put(self, t_data: Dict):
+        participants = parse_participants(t_data.get('who_will_use', ''))
+        # date_key is the normalized date that range filters and ordering use
+        values = [t_data.get(field) for field in TRANSACTION_FIELDS]
+        values += [len(participants), normalize_date(t_data.get('date'))]
+        columns = TRANSACTION_FIELDS + ['participant_count', 'date_key']
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != 'id')
+        # Upsert keeps the rowid, so stored order stays insertion order
+        self._conn.execute(
+            f"INSERT INTO transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            values
+        )
+        self._conn.execute("DELETE FROM transaction_participants WHERE transaction_id = ?", (t_data['id'],))
+        self._conn.executemany(
+            "INSERT INTO transaction_participants (transaction_id, person) VALUES (?, ?)",
+            [(t_data['id'], person) for person in participants]
+        )
+
+    def _put_settings(self, settings: Dict):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in settings.items()]
+        )
+
+    def commit(self, records, snapshot_source):
+        with self._lock, self._conn:
+            for record in expand_batches(records):
+                op = record.get('op')
+                if op == 'put':
+                    self._put(record['transaction'])
+                elif op == 'delete':
+                    self._conn.execute("DELETE FROM transactions WHERE id = ?", (record['id'],))
+                elif op == 'settings':
+                    self._put_settings(record['settings'])
+
+    def save_snapshot(self, data: Dict):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            for t_data in data.get('transactions', []):
+                self._put(t_data)
+            self._put_settings({key: data[key] for key in SETTINGS_KEYS if key in data})
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.path, f"{self.path}-wal")
+                   if os.path.exists(path))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        super().close()
+
+    # Query pushdown
+    def _where_clause(self, filters: Dict):
+        clauses = []
+        params = []
+
+        if filters.get('start_date'):
+            clauses.append("t.date_key >= ?")
+            params.append(normalize_date(filters['start_date']))
+        if filters.get('end_date'):
+            clauses.append("t.date_key <= ?")
+            params.append(normalize_date(filters['end_date']))
+
+        if filters.get('description'):
+            clauses.append("instr(lower(t.description), ?) > 0")
+            params.append(filters['description'].lower())
+
+        for field in EXACT_FILTER_FIELDS:
+            if filters.get(field):
+                clauses.append(f"t.{field} = ?")
+                params.append(filters[field])
+
+        if filters.get('who_will_use'):
+            person = filters['who_will_use'].strip()
+            clauses.append(
+                "(t.who_paid = ? OR EXISTS (SELECT 1 FROM transaction_participants p "
+                "WHERE p.transaction_id = t.id AND p.person = ?))"
+            )
+            params.extend([person, person])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query_transactions(self, filters: Dict) -> List[Dict]:
+        """Return stored records matching filter_transactions filters, oldest first"""
+        where, params = self._where_clause(filters)
+        columns = ', '.join(f"t.{field}" for field in TRANSACTION_FIELDS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM transactions t {where} ORDER BY t.date_key, t.id", params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_sub_account_spending(self, filters: Dict) -> Dict:
+        """Sum amounts per sub-account for transactions matching filters"""
+        where, params = self._where_clause(filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT t.account AS account, SUM(t.amount) AS total, COUNT(*) AS count "
+                f"FROM transactions t {where} GROUP BY t.account ORDER BY MIN(t.rowid)", params
+            ).fetchall()
+
+        return {
+            'total': sum(row['total'] for row in rows),
+            'by_sub_account': {row['account']: row['total'] for row in rows},
+            'transaction_count': sum(row['count'] for row in rows)
+        }
+
+    def query_balances(self) -> Dict[str, float]:
+        """Payer credit minus each participant's share, per person"""
+        with self._lock:
+            people = self._conn.execute(
+                "SELECT who_paid AS person FROM transactions "
+                "UNION SELECT person FROM transaction_participants"
+            ).fetchall()
+            credits = self._conn.execute(
+                "SELECT who_paid AS person, SUM(amount) AS total FROM transactions "
+                "WHERE participant_count > 0 GROUP BY who_paid"
+            ).fetchall()
+            debits = self._conn.execute(
+                "SELECT p.person AS person, SUM(t.amount / t.participant_count) AS total "
+                "FROM transaction_participants p JOIN transactions t ON t.id = p.transaction_id "
+                "GROUP BY p.person"
+            ).fetchall()
+
+        balances = {row['person']: 0.0 for row in people}
+        for row in credits:
+            balances[row['person']] += row['total']
+        for row in debits:
+            balances[row['person']] -= row['total']
+        return balances
+
+
+class WriteBehindStorageBackend(StorageBackend):
+    """Wraps a backend so commits return immediately and a writer thread group-commits them"""
+
+    # Pending commits are invisible to backend queries, so the manager answers from memory
+    supports_queries = False
+
+    def __init__(self, backend: StorageBackend, flush_interval: float = 1.0):
+        """
+        Initialize the write-behind wrapper
+
+        Args:
+            backend: Backend that receives the coalesced commits
+            flush_interval: Seconds a mutation may wait so later ones can join its flush
+        """
+        super().__init__(backend.path)
+        self.backend = backend
+        self.flush_interval = flush_interval
+
+        # Pending mutations and the newest state source to snapshot them from
+        self._pending: List[Dict] = []
+        self._snapshot_source: Optional[Callable[[], Callable[[], Dict]]] = None
+        self._dirty_since: Optional[float] = None
+        self._generation = 0          # commits accepted
+        self._flushed_generation = 0  # commits written to the backend
+        self.last_flush_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._state_lock: Callable[[], ContextManager] = nullcontext
+        self._stopping = False
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+        # The writer is a daemon thread; flush whatever is left when the process exits
+        atexit.register(self.close)
+
+    def load(self) -> Optional[Dict]:
+        return self.backend.load()
+
+    def bind_state_lock(self, state_lock):
+        self._state_lock = state_lock
+
+    def commit(self, records, snapshot_source):
+        with self._cond:
+            self._pending.extend(records)
+            self._snapshot_source = snapshot_source
+            self._generation += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+
+                # Hold the group open for the flush interval so bursts coalesce into one write
+                deadline = self._dirty_since + self.flush_interval
+                while not self._stopping and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+
+            self._write_pending()
+
+    def _write_pending(self) -> bool:
+        """Hand everything pending to the backend in one commit"""
+        # Lock order is always manager lock, then _write_lock: callers of flush() already hold the
+        # manager lock, and the writer thread takes it shared here. It covers only draining the
+        # records and capturing state (once per flush), not the write itself
+        with self._state_lock():
+            self._write_lock.acquire()
+            try:
+                with self._cond:
+                    records, snapshot_source = self._pending, self._snapshot_source
+                    generation = self._generation
+                    self._pending = []
+                # Pending records are exactly the changes since the last flush, so this state matches them
+                captured = snapshot_source() if records and snapshot_source else None
+            except BaseException:
+                self._write_lock.release()
+                raise
+
+        try:
+            if records:
+                try:
+                    self.backend.commit(records, lambda: captured)
+                except Exception as e:
+                    print(f"Error flushing transaction store: {e}")
+                    with self._cond:
+                        # Keep the records for the next attempt, one interval from now
+                        self._pending = records + self._pending
+                        self._dirty_since = time.monotonic()
+                        self.last_error = str(e)
+                    return False
+
+            with self._cond:
+                self._flushed_generation = generation
+                if not self._pending:
+                    self._dirty_since = None
+                if records:
+                    self.last_flush_at = datetime.now().isoformat()
+                    self.last_error = None
+            return True
+        finally:
+            self._write_lock.release()
+
+    def flush(self) -> bool:
+        """Write pending commits now instead of waiting for the writer thread"""
+        return self._write_pending() and self.backend.flush()
+
+    def flush_status(self) -> Dict:
+        with self._cond:
+            lag = time.monotonic() - self._dirty_since if self._dirty_since is not None else 0.0
+            return {
+                'mode': 'write_behind',
+                'pending_records': len(self._pending),
+                'flush_lag_seconds': round(lag, 3),
+                'last_flush_at': self.last_flush_at,
+                'last_error': self.last_error
+            }
+
+    def save_snapshot(self, data: Dict):
+        # A full snapshot supersedes pending records, but write them first to keep the order
+        self._write_pending()
+        self.backend.save_snapshot(data)
+
+    def compact(self, snapshot_source, background=True):
+        self._write_pending()
+        return self.backend.compact(snapshot_source, background)
+
+    def size_bytes(self) -> int:
+        return self.backend.size_bytes()
+
+    def close(self):
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        atexit.unregister(self.close)
+        self._writer.join()
+        self._write_pending()
+        self.backend.close()
+
+
+def migrate_json_to_sqlite(json_file: str, db_file: str) -> int:
+    """
+    One-shot migration of a transactions.json store (and any pending journal) into SQLite
+
+    Args:
+        json_file: Path to the existing transactions.json
+        db_file: Path of the SQLite database to create or overwrite
+
+    Returns:
+        Number of transactions migrated
+    """
+    data = JSONStorageBackend(json_file, use_journal=True).load()
+    if data is None:
+        raise FileNotFoundError(f"No transaction data found at {json_file}")
+
+    backend = SQLiteStorageBackend(db_file)
+    try:
+        backend.save_snapshot(data)
+    finally:
+        backend.close()
+    return len(data.get('transactions', []))
+
+
+def open_storage_backend(backend: str = 'json', data_file: str = "transactions.json",
+                         db_file: str = "transactions.db", use_journal: bool = False,
+                         journal_compact_threshold: int = 500, snapshot_format: str = 'json',
+                         write_behind_interval: float = 0, shared: bool = False) -> StorageBackend:
+    """Create the configured backend, migrating transactions.json into a new SQLite store"""
+    if backend == 'sqlite':
+        if not os.path.exists(db_file) and os.path.exists(data_file):
+            count = migrate_json_to_sqlite(data_file, db_file)
+            print(f"Migrated {count} transactions from {data_file} to {db_file}")
+        storage = SQLiteStorageBackend(db_file, shared)
+    elif backend == 'json':
+        storage = JSONStorageBackend(data_file, use_journal, journal_compact_threshold, snapshot_format, shared)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    if write_behind_interval > 0:
+        if shared:
+            raise ValueError("Write-behind cannot be combined with multi-process mode")
+        storage = WriteBehindStorageBackend(storage, write_behind_interval)
+    return storage
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.models.storage_backends <transactions.json> <transactions.db>")
+        sys.exit(1)
+
+    migrated = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Migrated {migrated} transactions to {sys.argv[2]}")
@@ -1,14 +1,33 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-import json
-import os
-import csv
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
+import sys
+import copy
+import bisect
+import threading
+import time
+import uuid
 from decimal import Decimal, ROUND_HALF_UP
 
-@dataclass
+from src.models.storage_backends import (StorageBackend, JSONStorageBackend, SETTINGS_KEYS, TRANSACTION_FIELDS,
+                                         expand_batches, normalize_date, parse_participants)
+from src.models.columnar_store import ColumnarTransactionStore, NUMPY_AVAILABLE
+from src.parsers.csv_parser import CSVCatalog, DEFAULT_CHUNK_SIZE, iter_csv_chunks, iter_csv_chunks_parallel
+from src.utils.rwlock import ReadWriteLock, read_locked, write_locked
+from src.utils.analytics_export import available_formats, iter_jsonl, write_columnar
+
+# Exact-match fields with an inverted index (value -> transaction ids)
+CATEGORICAL_FIELDS = ['who_paid', 'account', 'method_of_payment', 'type', 'parent_account']
+
+# Low-cardinality string fields shared across many rows; interned so rows share one object
+INTERNED_FIELDS = ('date', 'account', 'who_paid', 'who_will_use', 'method_of_payment', 'type', 'parent_account')
+
+# Sorts after every transaction id, for inclusive upper bounds on (date, id) keys
+MAX_ID_KEY = '\U0010ffff'
+
+@dataclass(slots=True)
 class Transaction:
-    """Enhanced transaction model with better validation and formatting"""
+    """Enhanced transaction model with better validation and formatting (slotted, no per-row __dict__)"""
     date: str
     description: str
     amount: float
@@ -21,15 +40,42 @@ class Transaction:
     id: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    _participants: Tuple[str, ...] = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.id is None:
             self.id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(self.description) % 10000}"
         
-        now = datetime.now().isoformat()
+        # Stored timestamps are kept as-is; update paths set updated_at themselves
         if self.created_at is None:
-            self.created_at = now
-        self.updated_at = now
+            self.created_at = datetime.now().isoformat()
+        if self.updated_at is None:
+            self.updated_at = self.created_at
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == 'who_will_use':
+            # Parse participants once per assignment instead of in every balance/filter loop
+            object.__setattr__(self, '_participants', tuple(sys.intern(p) for p in parse_participants(value)))
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Transaction':
+        """Build a transaction from a stored record, sharing repeated strings between rows"""
+        data = dict(data)
+        for name in INTERNED_FIELDS:
+            value = data.get(name)
+            if type(value) is str:
+                data[name] = sys.intern(value)
+        
+        # Most rows were never edited; keep one timestamp object for both fields
+        if data.get('updated_at') is not None and data.get('updated_at') == data.get('created_at'):
+            data['updated_at'] = data['created_at']
+        return cls(**data)
+    
+    @property
+    def participants(self) -> Tuple[str, ...]:
+        """People sharing this transaction, parsed from who_will_use"""
+        return self._participants
     
     @property
     def formatted_amount(self) -> str:
@@ -48,16 +94,75 @@ class Transaction:
     @property
     def split_amount(self) -> float:
         """Calculate amount per person when split"""
-        users = [user.strip() for user in self.who_will_use.split(',') if user.strip()]
+        users = self.participants
         if not users:
             return 0.0
         return round(self.amount / len(users), 2)
+    
+    def to_dict(self) -> Dict:
+        """Serialize transaction to the transactions.json record layout"""
+        return {
+            'date': self.date,
+            'description': self.description,
+            'amount': self.amount,
+            'account': self.account,
+            'who_paid': self.who_paid,
+            'who_will_use': self.who_will_use,
+            'method_of_payment': self.method_of_payment,
+            'type': self.type,
+            'parent_account': self.parent_account,
+            'id': self.id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
 
 class EnhancedTransactionManager:
     """Enhanced transaction manager with better data handling and validation"""
     
-    def __init__(self, data_file: str = "transactions.json"):
-        self.data_file = data_file
+    # Fields that updates may not change (the id keys every index)
+    IMMUTABLE_FIELDS = ('id', 'created_at')
+    
+    # Fields a caller may change through update_transactions
+    MUTABLE_FIELDS = frozenset(TRANSACTION_FIELDS) - set(IMMUTABLE_FIELDS) - {'updated_at'}
+    
+    # Below this many transactions the pure-Python rollups are as fast as NumPy
+    COLUMNAR_MIN_ROWS = 1000
+    
+    # Estimated memory of a loaded manager: fixed overhead plus each transaction with its index entries.
+    # Per-transaction cost measured with tracemalloc on hydrated stores of 50k-100k rows: the slotted
+    # object and its strings, id/date/dedupe/field/person indexes and the columnar arrays (1.28-1.38 KB)
+    BASE_MEMORY_BYTES = 64 * 1024
+    TRANSACTION_MEMORY_BYTES = 1400
+    
+    # State derived from the stored records; built on first access or by the background loader
+    LAZY_ATTRIBUTES = ('transactions', '_id_index', '_id_positions', '_dedupe_index', '_date_index',
+                       '_field_index', '_person_index', '_balance_ledger', '_columnar', '_change_seq', '_tombstones')
+    
+    def __init__(self, data_file: str = "transactions.json", use_journal: bool = False,
+                 journal_compact_threshold: int = 500, storage: Optional[StorageBackend] = None,
+                 background_load: bool = False):
+        # Pluggable persistence: the JSON file (optionally journaled) unless another backend is given
+        self.storage = storage or JSONStorageBackend(data_file, use_journal, journal_compact_threshold)
+        self.data_file = self.storage.path
+        
+        # Request threads share the manager: queries take the lock shared, mutations exclusively
+        # Multi-process mode: the outermost write also takes the store's file lock and catches up
+        self._rwlock = ReadWriteLock(on_write_acquired=self._begin_write, on_write_released=self._end_write)
+        self.storage.bind_state_lock(self._rwlock.read_lock)
+        
+        # Data version: bumped as every write finishes; the epoch tells this instance's counter
+        # apart from other processes' and from a reload after eviction
+        self.data_epoch = uuid.uuid4().hex[:12]
+        self.data_version = 0
+        
+        # Dashboard summaries of the current data version and day, by periods
+        self._summary_cache: Tuple[Optional[str], Dict[Tuple[str, ...], Dict]] = (None, {})
+        
+        # Raw stored records awaiting hydration (None once transactions and indexes are built)
+        self._raw_records: Optional[List[Dict]] = None
+        self._load_lock = threading.Lock()
+        self._load_thread: Optional[threading.Thread] = None
+        self.background_load = background_load
         self.transactions: List[Transaction] = []
         self.roommates: List[str] = []
         self.payment_methods: List[str] = []
@@ -66,6 +171,33 @@ class EnhancedTransactionManager:
         # Hierarchical account structure: parent -> list of sub-accounts
         self.parent_accounts: Dict[str, List[str]] = {}
         
+        # Primary-key index: id -> transaction and id -> position in self.transactions
+        self._id_index: Dict[str, Transaction] = {}
+        self._id_positions: Dict[str, int] = {}
+        
+        # Dedupe index: (date, normalized description, amount in cents) -> number of transactions
+        self._dedupe_index: Dict[Tuple[str, str, int], int] = {}
+        
+        # Date index: (normalized date, id) pairs kept sorted for bisect range queries
+        self._date_index: List[Tuple[str, str]] = []
+        
+        # Inverted indexes for exact-match filters: field -> value -> transaction ids
+        self._field_index: Dict[str, Dict[str, Set[str]]] = {field: {} for field in CATEGORICAL_FIELDS}
+        
+        # Person index: name -> ids of transactions they paid for or share
+        self._person_index: Dict[str, Set[str]] = {}
+        
+        # Balance ledger: running balance per person, adjusted by each indexed transaction
+        self._balance_ledger: Dict[str, float] = {}
+        
+        # Columnar mirror for vectorized analytics (None without NumPy)
+        self._columnar: Optional[ColumnarTransactionStore] = None
+        
+        # Change log for incremental exports: id -> data version of its last change this epoch
+        # (rows untouched since the load have none), and deleted id -> data version of the delete
+        self._change_seq: Dict[str, int] = {}
+        self._tombstones: Dict[str, int] = {}
+        
         # Metadata for better tracking
         self.metadata = {
             'version': '2.0',
@@ -100,32 +232,127 @@ class EnhancedTransactionManager:
     
     def load_data(self):
         """Enhanced data loading with better error handling"""
-        if os.path.exists(self.data_file):
+        try:
+            data = self.storage.load()
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            self._set_defaults()
+            return
+        
+        if data is None:
+            self._set_defaults()
+            return
+        
+        # Load other data with fallbacks
+        self.roommates = data.get('roommates', [])
+        self.parent_accounts = data.get('parent_accounts', self.get_default_parent_accounts())
+        self.payment_methods = data.get('payment_methods', self.get_default_payment_methods())
+        self.default_person = data.get('default_person', '')
+        self.metadata = data.get('metadata', self.metadata)
+        
+        # Keep the raw records; Transaction objects and indexes are built on first access
+        # (or right away in a background thread) so startup is not linear in history
+        with self._load_lock:
+            for name in self.LAZY_ATTRIBUTES:
+                self.__dict__.pop(name, None)
+            self._raw_records = data.get('transactions', [])
+        
+        if self.background_load:
+            self._load_thread = threading.Thread(target=self._ensure_loaded, daemon=True)
+            self._load_thread.start()
+    
+    # Multi-process coherence: with a shared backend every write runs under the store's
+    # file lock after applying what other processes wrote, so no update is lost
+    def _begin_write(self):
+        if self.storage.shared:
+            self.storage.acquire_process_lock()
+            self._sync_from_storage()
+    
+    def _end_write(self):
+        # Still under the write lock, so readers see the new data and the new version together
+        self.data_version += 1
+        if self.storage.shared:
+            self.storage.release_process_lock()
+    
+    def refresh(self) -> bool:
+        """Pick up changes other processes made to a shared store; returns True if there were any"""
+        if not self.storage.shared or not self.storage.has_external_changes():
+            return False
+        
+        # Taking the write lock runs _begin_write, which applies the changes
+        with self._rwlock.write_lock():
+            pass
+        return True
+    
+    def _sync_from_storage(self):
+        """Apply changes other processes made since this one last read or wrote the store"""
+        reload, records = self.storage.poll_changes()
+        if reload:
+            # Change versions of the old data mean nothing for the reloaded one
+            self.data_epoch = uuid.uuid4().hex[:12]
+            self.load_data()
+        elif records:
+            self._apply_records(records)
+    
+    def _apply_records(self, records: List[Dict]):
+        """Replay journal records written by another process onto the in-memory store"""
+        for record in expand_batches(records):
+            op = record.get('op')
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Load transactions with enhanced validation
-                    self.transactions = []
-                    for t_data in data.get('transactions', []):
-                        try:
-                            transaction = Transaction(**t_data)
-                            self.transactions.append(transaction)
-                        except Exception as e:
-                            print(f"Warning: Skipping invalid transaction: {e}")
-                    
-                    # Load other data with fallbacks
-                    self.roommates = data.get('roommates', [])
-                    self.parent_accounts = data.get('parent_accounts', self.get_default_parent_accounts())
-                    self.payment_methods = data.get('payment_methods', self.get_default_payment_methods())
-                    self.default_person = data.get('default_person', '')
-                    self.metadata = data.get('metadata', self.metadata)
-                    
+                if op == 'put':
+                    transaction = Transaction.from_dict(record['transaction'])
+                    if transaction.id in self._id_index:
+                        self._replace_transactions({transaction.id: transaction})
+                    else:
+                        self._append_transaction(transaction)
+                elif op == 'delete':
+                    transaction = self._id_index.get(record['id'])
+                    if transaction is not None:
+                        self._remove_transaction(transaction)
+                elif op == 'settings':
+                    for key in SETTINGS_KEYS:
+                        if key in record['settings']:
+                            setattr(self, key, record['settings'][key])
             except Exception as e:
-                print(f"Error loading data: {e}")
-                self._set_defaults()
-        else:
-            self._set_defaults()
+                print(f"Warning: Skipping invalid journal record: {e}")
+    
+    def __getattr__(self, name):
+        # Only reached while lazy state is missing, i.e. before the first build finished
+        if name in self.LAZY_ATTRIBUTES and '_load_lock' in self.__dict__:
+            self._ensure_loaded()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether transactions and indexes have been built"""
+        return self._raw_records is None
+    
+    def _ensure_loaded(self):
+        """Hydrate the raw records and build the indexes if that has not happened yet"""
+        with self._load_lock:
+            if self._raw_records is None:
+                return
+            
+            # Build on a shallow copy and publish everything in one dict update, so
+            # other threads never see half-built indexes
+            builder = copy.copy(self)
+            builder.transactions = []
+            for t_data in self._raw_records:
+                try:
+                    builder.transactions.append(Transaction.from_dict(t_data))
+                except Exception as e:
+                    print(f"Warning: Skipping invalid transaction: {e}")
+            reassigned = builder._rebuild_indexes()
+            
+            self.__dict__.update({name: builder.__dict__[name] for name in self.LAZY_ATTRIBUTES})
+            self._raw_records = None
+        
+        if reassigned:
+            # Older files can hold colliding ids; store the reassigned ones right away
+            if not self.storage.compact(self._snapshot_source, background=False):
+                self.storage.save_snapshot(self._snapshot_source()())
     
     def _set_defaults(self):
         """Set default values for new installations"""
@@ -135,56 +362,296 @@ class EnhancedTransactionManager:
         self.payment_methods = self.get_default_payment_methods()
         self.default_person = ''
         self.metadata['created_at'] = datetime.now().isoformat()
+        self._raw_records = None
+        self._rebuild_indexes()
     
+    # Index maintenance: every mutation unindexes a transaction before changing it
+    # and indexes it again afterwards, so lookups never scan self.transactions
+    def _rebuild_indexes(self) -> int:
+        """Rebuild all in-memory indexes from self.transactions, returning the number of ids reassigned"""
+        self._id_index = {}
+        self._id_positions = {}
+        self._dedupe_index = {}
+        self._date_index = []
+        self._field_index = {field: {} for field in CATEGORICAL_FIELDS}
+        self._person_index = {}
+        self._balance_ledger = {}
+        self._columnar = ColumnarTransactionStore() if NUMPY_AVAILABLE else None
+        self._change_seq = {}
+        self._tombstones = {}
+        
+        reassigned = 0
+        for position, transaction in enumerate(self.transactions):
+            if transaction.id in self._id_index:
+                old_id = transaction.id
+                self._assign_unique_id(transaction)
+                print(f"Warning: Duplicate transaction id {old_id} reassigned to {transaction.id}")
+                reassigned += 1
+            self._id_positions[transaction.id] = position
+            self._index_transaction(transaction, sorted_insert=False)
+        
+        # Loaded rows are the export baseline, not changes
+        self._change_seq.clear()
+        self._date_index.sort()
+        return reassigned
+    
+    def _assign_unique_id(self, transaction: Transaction):
+        """Suffix the id until it no longer collides with an existing transaction"""
+        base_id = transaction.id
+        suffix = 1
+        while transaction.id in self._id_index:
+            transaction.id = f"{base_id}_{suffix}"
+            suffix += 1
+    
+    def _index_transaction(self, transaction: Transaction, sorted_insert: bool = True):
+        self._id_index[transaction.id] = transaction
+        # Stamped under the write lock with the version the write publishes, so a reader at
+        # version N has seen every change stamped N or lower
+        self._change_seq[transaction.id] = self.data_version + 1
+        self._tombstones.pop(transaction.id, None)
+        key = self._dedupe_key(transaction)
+        self._dedupe_index[key] = self._dedupe_index.get(key, 0) + 1
+        
+        date_key = (normalize_date(transaction.date), transaction.id)
+        if sorted_insert:
+            bisect.insort(self._date_index, date_key)
+        else:
+            self._date_index.append(date_key)
+        
+        if self._columnar is not None:
+            self._columnar.add(transaction, date_key[0])
+        
+        for field in CATEGORICAL_FIELDS:
+            self._field_index[field].setdefault(getattr(transaction, field), set()).add(transaction.id)
+        
+        for person in self._people_in(transaction):
+            self._person_index.setdefault(person, set()).add(transaction.id)
+            self._balance_ledger.setdefault(person, 0.0)
+        self._apply_balance_deltas(transaction, 1)
+    
+    def _unindex_transaction(self, transaction: Transaction):
+        self._id_index.pop(transaction.id, None)
+        key = self._dedupe_key(transaction)
+        count = self._dedupe_index.get(key, 0) - 1
+        if count > 0:
+            self._dedupe_index[key] = count
+        else:
+            self._dedupe_index.pop(key, None)
+        
+        date_key = (normalize_date(transaction.date), transaction.id)
+        position = bisect.bisect_left(self._date_index, date_key)
+        if position < len(self._date_index) and self._date_index[position] == date_key:
+            del self._date_index[position]
+        
+        if self._columnar is not None:
+            self._columnar.remove(transaction.id)
+        
+        for field in CATEGORICAL_FIELDS:
+            values = self._field_index[field]
+            ids = values.get(getattr(transaction, field))
+            if ids is not None:
+                ids.discard(transaction.id)
+                if not ids:
+                    del values[getattr(transaction, field)]
+        
+        self._apply_balance_deltas(transaction, -1)
+        for person in self._people_in(transaction):
+            ids = self._person_index.get(person)
+            if ids is not None:
+                ids.discard(transaction.id)
+                if not ids:
+                    del self._person_index[person]
+                    self._balance_ledger.pop(person, None)
+    
+    def _apply_balance_deltas(self, transaction: Transaction, sign: int):
+        """Add (sign=1) or reverse (sign=-1) a transaction's effect on the balance ledger"""
+        users = transaction.participants
+        if not users:
+            return
+        
+        amount = sign * float(transaction.amount)
+        amount_per_person = amount / len(users)
+        ledger = self._balance_ledger
+        
+        # Payer gets credit for the full amount they paid, each user owes their share
+        ledger[transaction.who_paid] += amount
+        for user in users:
+            ledger[user] -= amount_per_person
+        
+        # Keep float residue from add/remove cycles from reading as a balance
+        for person in (transaction.who_paid,) + users:
+            if abs(ledger[person]) < 1e-9:
+                ledger[person] = 0.0
+    
+    @staticmethod
+    def _people_in(transaction: Transaction) -> Set[str]:
+        """Payer and participants of a transaction"""
+        people = set(transaction.participants)
+        people.add(transaction.who_paid)
+        return people
+    
+    def _columnar_filter_mask(self, filters: Dict):
+        """Columnar row mask of the transactions filter_transactions(filters) returns"""
+        start_date = normalize_date(filters['start_date']) if filters.get('start_date') else None
+        end_date = normalize_date(filters['end_date']) if filters.get('end_date') else None
+        equals = {field: filters[field] for field in CATEGORICAL_FIELDS if filters.get(field)}
+        person_ids = None
+        if filters.get('who_will_use'):
+            person_ids = self._person_index.get(filters['who_will_use'].strip(), set())
+        mask = self._columnar.filter_mask(start_date, end_date, person_ids, **equals)
+        
+        # Text search has no column; check descriptions of the rows the other filters left
+        if filters.get('description'):
+            search_term = filters['description'].lower()
+            matching = [transaction_id for transaction_id in self._columnar.row_ids(mask)
+                        if search_term in self._id_index[transaction_id].description.lower()]
+            mask = self._columnar.filter_mask(start_date, end_date, matching, **equals)
+        return mask
+    
+    def _use_columnar(self) -> bool:
+        """Whether analytics should run on the columnar mirror"""
+        return self._columnar is not None and len(self._columnar) >= self.COLUMNAR_MIN_ROWS
+    
+    @staticmethod
+    def _date_bounds(start_date: str = None, end_date: str = None) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+        """Inclusive (date, id) keys bounding a date range"""
+        low_key = (normalize_date(start_date), '') if start_date else ('', '')
+        high_key = (normalize_date(end_date), MAX_ID_KEY) if end_date else (MAX_ID_KEY, MAX_ID_KEY)
+        return low_key, high_key
+    
+    def _matching_ids(self, filters: Dict) -> Optional[Set[str]]:
+        """Ids matching the exact-match and person filters, or None when there are none"""
+        id_sets = [self._field_index[field].get(filters[field], set())
+                   for field in CATEGORICAL_FIELDS if filters.get(field)]
+        if filters.get('who_will_use'):
+            id_sets.append(self._person_index.get(filters['who_will_use'].strip(), set()))
+        if not id_sets:
+            return None
+        
+        # Intersect the smallest sets first so the work tracks the result size
+        id_sets.sort(key=len)
+        matching = set(id_sets[0])
+        for ids in id_sets[1:]:
+            if not matching:
+                break
+            matching &= ids
+        return matching
+    
+    def _indexed_query(self, filters: Dict) -> List[Transaction]:
+        """Date-ordered transactions matching the date range, exact-match and person filters"""
+        low_key, high_key = self._date_bounds(filters.get('start_date'), filters.get('end_date'))
+        low = bisect.bisect_left(self._date_index, low_key)
+        high = bisect.bisect_right(self._date_index, high_key)
+        
+        matching = self._matching_ids(filters)
+        if matching is None:
+            return [self._id_index[transaction_id] for _, transaction_id in self._date_index[low:high]]
+        
+        if len(matching) < high - low:
+            keyed = []
+            for transaction_id in matching:
+                transaction = self._id_index[transaction_id]
+                key = (normalize_date(transaction.date), transaction_id)
+                if low_key <= key <= high_key:
+                    keyed.append((key, transaction))
+            keyed.sort(key=lambda item: item[0])
+            return [transaction for _, transaction in keyed]
+        
+        return [self._id_index[transaction_id] for _, transaction_id in self._date_index[low:high]
+                if transaction_id in matching]
+    
+    @staticmethod
+    def _dedupe_key(transaction: Transaction) -> Tuple[str, str, int]:
+        """Duplicate-detection key: date, lowercased description and amount in cents"""
+        try:
+            cents = int(round(float(transaction.amount) * 100))
+        except (TypeError, ValueError):
+            cents = 0
+        return (transaction.date, (transaction.description or '').strip().lower(), cents)
+    
+    def _settings_dict(self) -> Dict:
+        """Collect the non-transaction parts of the data file"""
+        return {
+            'roommates': list(self.roommates),
+            'parent_accounts': {parent: list(subs) for parent, subs in self.parent_accounts.items()},
+            'payment_methods': list(self.payment_methods),
+            'default_person': self.default_person
+        }
+    
+    def _build_snapshot(self, transactions: List[Transaction]) -> Dict:
+        """Build the full transactions.json document"""
+        data = {'transactions': [t.to_dict() for t in transactions]}
+        data.update(self._settings_dict())
+        data['metadata'] = dict(self.metadata)
+        return data
+    
+    def _snapshot_source(self):
+        """Capture current state cheaply; the returned callable builds the full document"""
+        # Transactions are replaced rather than mutated, so a list copy is an immutable snapshot
+        with self._rwlock.read_lock():
+            transactions = list(self.transactions)
+            settings = self._settings_dict()
+            settings['metadata'] = dict(self.metadata)
+        return lambda: dict({'transactions': [t.to_dict() for t in transactions]}, **settings)
+    
+    @write_locked
     def save_data(self):
         """Enhanced data saving with metadata tracking"""
         self.metadata['last_updated'] = datetime.now().isoformat()
         
-        data = {
-            'transactions': [
-                {
-                    'date': t.date,
-                    'description': t.description,
-                    'amount': t.amount,
-                    'account': t.account,
-                    'who_paid': t.who_paid,
-                    'who_will_use': t.who_will_use,
-                    'method_of_payment': t.method_of_payment,
-                    'type': t.type,
-                    'parent_account': t.parent_account,
-                    'id': t.id,
-                    'created_at': t.created_at,
-                    'updated_at': t.updated_at
-                }
-                for t in self.transactions
-            ],
-            'roommates': self.roommates,
-            'parent_accounts': self.parent_accounts,
-            'payment_methods': self.payment_methods,
-            'default_person': self.default_person,
-            'metadata': self.metadata
-        }
-        
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.storage.save_snapshot(self._build_snapshot(self.transactions))
         except Exception as e:
             print(f"Error saving data: {e}")
             raise
     
+    def _persist(self, records: List[Dict]):
+        """Persist mutation records through the storage backend"""
+        self.metadata['last_updated'] = datetime.now().isoformat()
+        self.storage.commit(records, self._snapshot_source)
+    
+    def _persist_transaction(self, transaction: Transaction):
+        self._persist([{'op': 'put', 'transaction': transaction.to_dict()}])
+    
+    def _persist_settings(self):
+        settings = self._settings_dict()
+        settings['metadata'] = dict(self.metadata)
+        self._persist([{'op': 'settings', 'settings': settings}])
+    
+    def flush(self) -> bool:
+        """Make every change durable now (a no-op unless write-behind is enabled)"""
+        return self.storage.flush()
+    
+    def get_persistence_status(self) -> Dict:
+        """Pending writes and flush lag of the storage backend"""
+        return self.storage.flush_status()
+    
+    def estimated_memory_bytes(self) -> int:
+        """Rough in-memory footprint, used to budget how many managers stay loaded"""
+        records = self.__dict__.get('transactions')
+        if records is None:
+            records = self._raw_records or []
+        return self.BASE_MEMORY_BYTES + len(records) * self.TRANSACTION_MEMORY_BYTES
+    
+    def close(self) -> bool:
+        """Flush pending writes and release the storage backend; returns False (and stays open) if the flush failed"""
+        # Wait out in-flight mutations; the file lock is released before the backend closes
+        with self._rwlock.write_lock():
+            if not self.flush():
+                return False
+        self.storage.close()
+        return True
+    
+    @write_locked
+    def compact_journal(self, background: bool = True) -> bool:
+        """Fold the journal into a fresh snapshot of the data file"""
+        return self.storage.compact(self._snapshot_source, background)
+    
+    @write_locked
     def add_transaction(self, transaction: Transaction) -> bool:
         """Add transaction with validation and global defaults"""
         try:
-            # Apply global defaults if fields are missing
-            if not transaction.who_paid and self.default_person:
-                transaction.who_paid = self.default_person
-            
-            if not transaction.method_of_payment and self.payment_methods:
-                transaction.method_of_payment = self.payment_methods[0]
-            
-            # If who_will_use is empty, use who_paid as fallback
-            if not transaction.who_will_use and transaction.who_paid:
-                transaction.who_will_use = transaction.who_paid
+            self._apply_defaults(transaction)
             
             # Validate transaction
             if not self._validate_transaction(transaction):
@@ -194,14 +661,102 @@ class EnhancedTransactionManager:
             if self._is_duplicate(transaction):
                 return False
             
-            self.transactions.append(transaction)
-            self.save_data()
+            self._insert_transaction(transaction)
+            self._persist_transaction(transaction)
             return True
         except Exception as e:
             print(f"Error adding transaction: {e}")
             return False
     
-    def _validate_transaction(self, transaction: Transaction) -> bool:
+    @write_locked
+    def add_transactions(self, transactions: List[Transaction]) -> List[Dict]:
+        """Add a batch of transactions with a single persist; returns one result per row"""
+        results = []
+        accepted = []
+        batch_keys = set()
+        valid_accounts = self._valid_accounts()
+        
+        for row, transaction in enumerate(transactions):
+            result = {'row': row, 'success': False, 'id': None, 'error': None}
+            results.append(result)
+            try:
+                self._apply_defaults(transaction)
+                
+                if not self._validate_transaction(transaction, valid_accounts):
+                    result['error'] = 'Missing or invalid fields'
+                    continue
+                
+                # Duplicates are checked against the store and earlier rows of this batch
+                key = self._dedupe_key(transaction)
+                if key in batch_keys or key in self._dedupe_index:
+                    result['error'] = 'Duplicate transaction'
+                    continue
+                
+                batch_keys.add(key)
+                accepted.append((result, transaction))
+            except Exception as e:
+                result['error'] = str(e)
+        
+        if not accepted:
+            return results
+        
+        # Append the date keys and sort once: per-row insort is O(n) each, quadratic for big batches
+        for result, transaction in accepted:
+            self._insert_transaction(transaction, sorted_insert=False)
+        self._date_index.sort()
+        
+        try:
+            self._persist([{'op': 'put', 'transaction': t.to_dict()} for _, t in accepted])
+        except Exception as e:
+            # All or nothing: undo the in-memory inserts when the batch cannot be saved
+            print(f"Error adding transactions: {e}")
+            for result, transaction in reversed(accepted):
+                self._remove_transaction(transaction)
+                result['error'] = f"Save failed: {e}"
+            return results
+        
+        for result, transaction in accepted:
+            result['success'] = True
+            result['id'] = transaction.id
+        return results
+    
+    def _apply_defaults(self, transaction: Transaction):
+        """Fill in payer, payment method and users from the global defaults"""
+        if not transaction.who_paid and self.default_person:
+            transaction.who_paid = self.default_person
+        
+        if not transaction.method_of_payment and self.payment_methods:
+            transaction.method_of_payment = self.payment_methods[0]
+        
+        # If who_will_use is empty, use who_paid as fallback
+        if not transaction.who_will_use and transaction.who_paid:
+            transaction.who_will_use = transaction.who_paid
+    
+    def _insert_transaction(self, transaction: Transaction, sorted_insert: bool = True):
+        """Append a validated transaction and index it"""
+        # Ids are time-based, so a bulk import within one second can collide
+        self._assign_unique_id(transaction)
+        self._append_transaction(transaction, sorted_insert)
+    
+    def _append_transaction(self, transaction: Transaction, sorted_insert: bool = True):
+        """Append a transaction under its existing id and index it"""
+        self._id_positions[transaction.id] = len(self.transactions)
+        self.transactions.append(transaction)
+        self._index_transaction(transaction, sorted_insert)
+    
+    def _remove_transaction(self, transaction: Transaction):
+        """Remove an indexed transaction from the list and indexes"""
+        # Swap the last transaction into the freed slot so removal is O(1)
+        position = self._id_positions.pop(transaction.id)
+        self._unindex_transaction(transaction)
+        self._change_seq.pop(transaction.id, None)
+        self._tombstones[transaction.id] = self.data_version + 1
+        last = self.transactions.pop()
+        if last is not transaction:
+            self.transactions[position] = last
+            self._id_positions[last.id] = position
+    
+    def _validate_transaction(self, transaction: Transaction, valid_accounts: Optional[Set[str]] = None) -> bool:
         """Validate transaction data with flexible account validation"""
         if not transaction.date or not transaction.description:
             return False
@@ -213,67 +768,97 @@ class EnhancedTransactionManager:
             return False
         
         # Validate account - allow both sub-accounts and parent accounts, empty strings, and "Select" variations
-        all_sub_accounts = self.get_all_sub_accounts()
-        all_parent_accounts = self.parent_accounts.keys()
+        if valid_accounts is None:
+            valid_accounts = self._valid_accounts()
         
         # Allow empty accounts, "Select Account", "Select", or valid accounts
-        if (transaction.account and 
-            transaction.account not in all_sub_accounts and 
-            transaction.account not in all_parent_accounts and
-            transaction.account != "Select Account" and
-            transaction.account != "Select"):
+        if transaction.account and transaction.account not in valid_accounts:
             return False
         
         return True
     
+    def _valid_accounts(self) -> Set[str]:
+        """Account names a transaction may use"""
+        valid_accounts = set(self.get_all_sub_accounts())
+        valid_accounts.update(self.parent_accounts.keys())
+        valid_accounts.update(("Select Account", "Select"))
+        return valid_accounts
+    
     def _is_duplicate(self, transaction: Transaction) -> bool:
         """Check if transaction is a duplicate"""
-        for existing in self.transactions:
-            if (existing.date == transaction.date and 
-                existing.description.lower() == transaction.description.lower() and
-                abs(existing.amount - transaction.amount) < 0.01):
-                return True
-        return False
-    
-    def update_transaction(self, transaction_id: str, updates: Dict) -> bool:
-        """Update transaction with validation"""
-        try:
-            transaction = self.get_transaction_by_id(transaction_id)
-            if not transaction:
-                return False
-            
-            # Update fields
-            for key, value in updates.items():
-                if hasattr(transaction, key):
-                    setattr(transaction, key, value)
-            
-            transaction.updated_at = datetime.now().isoformat()
-            
-            if self._validate_transaction(transaction):
-                self.save_data()
-                return True
-            return False
-        except Exception as e:
-            print(f"Error updating transaction: {e}")
-            return False
+        return self._dedupe_key(transaction) in self._dedupe_index
     
+    @write_locked
     def delete_transaction(self, transaction_id: str) -> bool:
         """Delete transaction by ID"""
         try:
-            self.transactions = [t for t in self.transactions if t.id != transaction_id]
-            self.save_data()
+            transaction = self._id_index.get(transaction_id)
+            if transaction is None:
+                return True
+            
+            self._remove_transaction(transaction)
+            self._persist([{'op': 'delete', 'id': transaction_id}])
             return True
         except Exception as e:
             print(f"Error deleting transaction: {e}")
             return False
     
+    @read_locked
+    def get_all_transactions(self) -> List[Transaction]:
+        """Snapshot of every transaction"""
+        return list(self.transactions)
+    
+    @read_locked
+    def get_changes(self, since: Optional[str] = None) -> Tuple[List[Transaction], List[str], str, bool]:
+        """
+        Transactions changed and ids deleted after a change cursor, oldest change first
+        
+        Args:
+            since: Cursor from an earlier call; None, or one from another epoch (the store was
+                reloaded since), gives every transaction
+        
+        Returns:
+            (changed, deleted_ids, next_since, full): full is True when changed holds every
+            transaction and deleted_ids is empty, so the consumer should replace its copy
+        """
+        next_since = f"{self.data_epoch}-{self.data_version}"
+        epoch, _, version = (since or '').rpartition('-')
+        if epoch != self.data_epoch or not version.isdigit():
+            return list(self.transactions), [], next_since, True
+        
+        version = int(version)
+        changed = sorted((seq, transaction_id) for transaction_id, seq in self._change_seq.items() if seq > version)
+        deleted = sorted((seq, transaction_id) for transaction_id, seq in self._tombstones.items() if seq > version)
+        return ([self._id_index[transaction_id] for _, transaction_id in changed],
+                [transaction_id for _, transaction_id in deleted], next_since, False)
+    
+    def export_analytics(self, export_format: str = 'jsonl', since: Optional[str] = None) -> Tuple[Iterable, str, bool]:
+        """
+        Export transactions with typed columns for analysis jobs
+        
+        Args:
+            export_format: 'jsonl', or 'parquet' / 'arrow' when pyarrow is installed
+            since: Change cursor from an earlier export; only rows changed or deleted after it
+                are exported (deletions as rows with deleted set)
+        
+        Returns:
+            (chunks, next_since, full): the encoded export in chunks, the cursor for the next
+            incremental export, and whether this is a full export rather than an increment
+        """
+        if export_format not in available_formats():
+            raise ValueError(f"Unsupported export format: {export_format}")
+        
+        transactions, deleted_ids, next_since, full = self.get_changes(since)
+        if export_format == 'jsonl':
+            return iter_jsonl(transactions, deleted_ids), next_since, full
+        return [write_columnar(transactions, export_format, deleted_ids)], next_since, full
+    
+    @read_locked
     def get_transaction_by_id(self, transaction_id: str) -> Optional[Transaction]:
         """Get transaction by ID"""
-        for transaction in self.transactions:
-            if transaction.id == transaction_id:
-                return transaction
-        return None
+        return self._id_index.get(transaction_id)
     
+    @read_locked
     def get_all_sub_accounts(self) -> List[str]:
         """Get all sub-accounts from all parent accounts"""
         all_sub_accounts = []
@@ -281,37 +866,72 @@ class EnhancedTransactionManager:
             all_sub_accounts.extend(sub_accounts)
         return all_sub_accounts
     
+    @read_locked
     def get_sub_accounts_for_parent(self, parent_account: str) -> List[str]:
         """Get sub-accounts for a specific parent"""
         return self.parent_accounts.get(parent_account, [])
     
+    @read_locked
     def filter_transactions(self, filters: Dict) -> List[Transaction]:
-        """Enhanced filtering with better performance"""
-        filtered = self.transactions
-        
-        # Date range filtering
-        if 'start_date' in filters and filters['start_date']:
-            filtered = [t for t in filtered if t.date >= filters['start_date']]
+        """Enhanced filtering with better performance (results are ordered oldest first)"""
+        if self.storage.supports_queries:
+            return [Transaction.from_dict(t_data) for t_data in self.storage.query_transactions(filters)]
         
-        if 'end_date' in filters and filters['end_date']:
-            filtered = [t for t in filtered if t.date <= filters['end_date']]
+        # Date range, exact matching and "who_will_use" filters: sorted date index plus inverted indexes
+        filtered = self._indexed_query(filters)
         
         # Text-based filtering
         if 'description' in filters and filters['description']:
             search_term = filters['description'].lower()
             filtered = [t for t in filtered if search_term in t.description.lower()]
         
-        # Exact matching filters
-        for field in ['who_paid', 'account', 'method_of_payment', 'type', 'parent_account']:
-            if field in filters and filters[field]:
-                filtered = [t for t in filtered if getattr(t, field) == filters[field]]
+        return filtered
+    
+    @read_locked
+    def page_transactions(self, filters: Dict, limit: int = 100,
+                          cursor: Optional[Tuple[str, str]] = None) -> Tuple[List[Transaction], Optional[Tuple[str, str]]]:
+        """
+        One page of filtered transactions, newest first, using keyset pagination
         
-        # Enhanced "who_will_use" filtering
-        if 'who_will_use' in filters and filters['who_will_use']:
-            search_person = filters['who_will_use'].strip()
-            filtered = [t for t in filtered if self._person_in_transaction(t, search_person)]
+        Args:
+            filters: Same filters as filter_transactions
+            limit: Most transactions in the page
+            cursor: (date, id) key of the last row of the previous page, or None for the first page
         
-        return filtered
+        Returns:
+            (transactions, next_cursor): next_cursor is None on the last page
+        """
+        low_key, high_key = self._date_bounds(filters.get('start_date'), filters.get('end_date'))
+        low = bisect.bisect_left(self._date_index, low_key)
+        high = bisect.bisect_right(self._date_index, high_key)
+        if cursor is not None:
+            # The cursor row itself was on the previous page, so it is excluded
+            cursor = tuple(cursor)
+            high = min(high, bisect.bisect_left(self._date_index, cursor))
+        
+        matching = self._matching_ids(filters)
+        search_term = (filters.get('description') or '').lower()
+        
+        if matching is not None and len(matching) < high - low:
+            # Few matches: order just those instead of walking the date range
+            keys = sorted((key for key in ((normalize_date(self._id_index[i].date), i) for i in matching)
+                           if low_key <= key <= high_key and (cursor is None or key < cursor)), reverse=True)
+        else:
+            keys = (self._date_index[position] for position in range(high - 1, low - 1, -1))
+        
+        page = []
+        last_key = None
+        for key in keys:
+            if matching is not None and key[1] not in matching:
+                continue
+            transaction = self._id_index[key[1]]
+            if search_term and search_term not in transaction.description.lower():
+                continue
+            if len(page) == limit:
+                return page, last_key
+            page.append(transaction)
+            last_key = key
+        return page, None
     
     def _person_in_transaction(self, transaction: Transaction, person: str) -> bool:
         """Check if person is involved in transaction"""
@@ -319,19 +939,38 @@ class EnhancedTransactionManager:
         if transaction.who_paid == person:
             return True
         
-        # Check who_will_use (comma-separated)
-        users = [user.strip() for user in transaction.who_will_use.split(',')]
-        return person in users
+        # Check who_will_use (parsed once into participants)
+        return person in transaction.participants
     
+    @read_locked
     def calculate_balances(self) -> Dict[str, float]:
-        """Calculate roommate balances with enhanced logic"""
+        """Calculate roommate balances with enhanced logic (read from the balance ledger)"""
+        return dict(self._balance_ledger)
+    
+    @write_locked
+    def check_balance_ledger(self, repair: bool = True, tolerance: float = 0.005) -> bool:
+        """Recompute balances from scratch and compare them with the ledger"""
+        if self.storage.supports_queries:
+            expected = self.storage.query_balances()
+        else:
+            expected = self._compute_balances()
+        
+        consistent = (expected.keys() == self._balance_ledger.keys() and
+                      all(abs(expected[p] - self._balance_ledger[p]) <= tolerance for p in expected))
+        if not consistent and repair:
+            print("Warning: Balance ledger out of sync, rebuilding")
+            self._balance_ledger = {person: expected.get(person, 0.0) for person in self._person_index}
+        return consistent
+    
+    def _compute_balances(self) -> Dict[str, float]:
+        """Calculate roommate balances from scratch"""
         balances = {}
         
         # Get all unique people
         all_people = set()
         for transaction in self.transactions:
             all_people.add(transaction.who_paid)
-            all_people.update([user.strip() for user in transaction.who_will_use.split(',')])
+            all_people.update(transaction.participants)
         
         # Initialize balances
         for person in all_people:
@@ -340,13 +979,14 @@ class EnhancedTransactionManager:
         # Calculate balances
         for transaction in self.transactions:
             payer = transaction.who_paid
-            users = [user.strip() for user in transaction.who_will_use.split(',') if user.strip()]
+            users = transaction.participants
             
             if users:
-                amount_per_person = transaction.amount / len(users)
+                amount = float(transaction.amount)
+                amount_per_person = amount / len(users)
                 
                 # Payer gets credit for the full amount they paid
-                balances[payer] += transaction.amount
+                balances[payer] += amount
                 
                 # Each user owes their share
                 for user in users:
@@ -354,22 +994,28 @@ class EnhancedTransactionManager:
         
         return balances
     
-    def get_spending_by_period(self, period: str = 'month') -> Dict:
-        """Get spending data by time period"""
-        now = datetime.now()
-        
+    @staticmethod
+    def _period_start(period: str, now: datetime) -> str:
+        """First date (YYYY-MM-DD) of a dashboard spending period ending today"""
         if period == 'week':
-            start_date = (now - timedelta(days=7)).strftime('%Y-%m-%d')
+            return (now - timedelta(days=7)).strftime('%Y-%m-%d')
         elif period == 'month':
-            start_date = now.replace(day=1).strftime('%Y-%m-%d')
+            return now.replace(day=1).strftime('%Y-%m-%d')
         elif period == 'quarter':
             quarter_start = (now.month - 1) // 3 * 3 + 1
-            start_date = now.replace(month=quarter_start, day=1).strftime('%Y-%m-%d')
-        else:
-            start_date = now.strftime('%Y-%m-%d')
-        
+            return now.replace(month=quarter_start, day=1).strftime('%Y-%m-%d')
+        return now.strftime('%Y-%m-%d')
+    
+    @read_locked
+    def get_spending_by_period(self, period: str = 'month') -> Dict:
+        """Get spending data by time period"""
+        now = datetime.now()
+        start_date = self._period_start(period, now)
         end_date = now.strftime('%Y-%m-%d')
         
+        if self._use_columnar():
+            return self._columnar.period_spending(start_date, end_date)
+        
         period_transactions = self.filter_transactions({
             'start_date': start_date,
             'end_date': end_date,
@@ -387,6 +1033,7 @@ class EnhancedTransactionManager:
             'transaction_count': len(period_transactions)
         }
     
+    @read_locked
     def get_parent_account_spending(self, parent_account: str, start_date: str = None, end_date: str = None) -> Dict:
         """Get spending by parent account"""
         filters = {'parent_account': parent_account, 'type': 'expense'}
@@ -395,6 +1042,12 @@ class EnhancedTransactionManager:
         if end_date:
             filters['end_date'] = end_date
         
+        if self._use_columnar():
+            return self._columnar.sub_account_spending(parent_account, start_date, end_date)
+        
+        if self.storage.supports_queries:
+            return self.storage.query_sub_account_spending(filters)
+        
         transactions = self.filter_transactions(filters)
         
         spending_by_sub_account = {}
@@ -408,141 +1061,243 @@ class EnhancedTransactionManager:
             'transaction_count': len(transactions)
         }
     
+    def summary_version(self) -> str:
+        """Changes whenever a dashboard summary may: after every write and when the day (and so the periods) rolls over"""
+        return f"{self.data_epoch}-{self.data_version}-{datetime.now():%Y%m%d}"
+    
+    @read_locked
+    def get_dashboard_summary(self, periods: Tuple[str, ...] = ('week', 'month', 'quarter')) -> Dict:
+        """Every dashboard number, recomputed only when summary_version() changes (treat the result as read-only)"""
+        periods = tuple(periods)
+        version = self.summary_version()
+        cached_version, summaries = self._summary_cache
+        if cached_version != version:
+            summaries = {}
+            self._summary_cache = (version, summaries)
+        
+        summary = summaries.get(periods)
+        if summary is None:
+            summary = summaries[periods] = self._compute_dashboard_summary(periods)
+        return summary
+    
+    def _compute_dashboard_summary(self, periods: Tuple[str, ...]) -> Dict:
+        """Compute every dashboard number in a single pass over the transactions"""
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        period_starts = [(period, self._period_start(period, now)) for period in periods]
+        
+        if self._use_columnar():
+            period_spending = {period: self._columnar.period_spending(start_date, today)
+                               for period, start_date in period_starts}
+            parent_account_spending = self._columnar.all_sub_account_spending(self.parent_accounts)
+        else:
+            period_spending, parent_account_spending = self._aggregate_expenses(period_starts, today)
+        
+        summary = {f'{period}_spending': period_spending[period] for period in periods}
+        summary.update({
+            'stats': self.get_statistics(),
+            'balances': self.calculate_balances(),
+            'parent_account_spending': parent_account_spending
+        })
+        return summary
+    
+    def _aggregate_expenses(self, period_starts: List[Tuple[str, str]], today: str) -> Tuple[Dict, Dict]:
+        """Period/payer and parent/sub-account expense totals in one pass over the date index"""
+        period_spending = {period: {'total_spending': 0, 'by_person': {}, 'transaction_count': 0}
+                           for period, _ in period_starts}
+        parent_account_spending = {parent: {'total': 0, 'by_sub_account': {}, 'transaction_count': 0}
+                                   for parent in self.parent_accounts}
+        
+        for date_key, transaction_id in self._date_index:
+            transaction = self._id_index[transaction_id]
+            if transaction.type != 'expense':
+                continue
+            amount = transaction.amount
+            
+            # Totals per parent account and sub-account
+            parent = parent_account_spending.get(transaction.parent_account)
+            if parent is not None:
+                parent['total'] += amount
+                parent['transaction_count'] += 1
+                by_sub_account = parent['by_sub_account']
+                by_sub_account[transaction.account] = by_sub_account.get(transaction.account, 0) + amount
+            
+            # Totals per period and payer
+            if date_key > today:
+                continue
+            for period, start_date in period_starts:
+                if date_key >= start_date:
+                    spending = period_spending[period]
+                    spending['total_spending'] += amount
+                    spending['transaction_count'] += 1
+                    by_person = spending['by_person']
+                    by_person[transaction.who_paid] = by_person.get(transaction.who_paid, 0) + amount
+        
+        return period_spending, parent_account_spending
+    
+    @read_locked
+    def csv_catalog(self) -> CSVCatalog:
+        """Snapshot of the names CSV rows are validated against"""
+        return CSVCatalog(
+            roommates=frozenset(self.roommates),
+            payment_methods=frozenset(self.payment_methods),
+            accounts=frozenset(self.get_all_sub_accounts())
+        )
+    
+    def iter_csv_transactions(self, csv_file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              workers: int = 0) -> Iterator[Tuple[List[Tuple[int, Dict]], List[str]]]:
+        """
+        Stream validated CSV rows in chunks of (row number, transaction data) pairs with that chunk's errors
+        
+        With workers > 1 the file is parsed in byte ranges by a process pool; chunks still arrive in file order
+        """
+        catalog = self.csv_catalog()
+        try:
+            if workers > 1:
+                yield from iter_csv_chunks_parallel(csv_file_path, catalog, workers, chunk_size)
+                return
+            with open(csv_file_path, 'r', encoding='utf-8') as file:
+                yield from iter_csv_chunks(file, catalog, chunk_size)
+        except Exception as e:
+            yield [], [f"Error reading CSV file: {str(e)}"]
+    
     def parse_csv_transactions(self, csv_file_path: str) -> Tuple[List[Dict], List[str]]:
         """Enhanced CSV parsing with better validation"""
         transactions = []
         errors = []
+        for rows, chunk_errors in self.iter_csv_transactions(csv_file_path):
+            transactions.extend(data for _, data in rows)
+            errors.extend(chunk_errors)
+        return transactions, errors
+    
+    def import_csv_transactions(self, csv_file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                max_errors: int = 100, workers: int = 0) -> Dict:
+        """
+        Stream a CSV file into the store, one add_transactions batch per chunk
         
-        try:
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Validate required fields
-                        required_fields = ['Date', 'Description', 'Amount', 'Account', 'Who Paid', 'Who Will Use', 'Method of Payment']
-                        missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
-                        
-                        if missing_fields:
-                            errors.append(f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}")
-                            continue
-                        
-                        # Validate data against system
-                        if row['Who Paid'] not in self.roommates:
-                            errors.append(f"Row {row_num}: 'Who Paid' ({row['Who Paid']}) not found in roommates list")
-                            continue
-                        
-                        if row['Method of Payment'] not in self.payment_methods:
-                            errors.append(f"Row {row_num}: 'Method of Payment' ({row['Method of Payment']}) not found in payment methods list")
-                            continue
-                        
-                        all_sub_accounts = self.get_all_sub_accounts()
-                        if row['Account'] not in all_sub_accounts:
-                            errors.append(f"Row {row_num}: 'Account' ({row['Account']}) not found in accounts list")
-                            continue
-                        
-                        # Parse amount
-                        try:
-                            amount = float(row['Amount'].replace('$', '').replace(',', ''))
-                        except ValueError:
-                            errors.append(f"Row {row_num}: Invalid amount format: {row['Amount']}")
-                            continue
-                        
-                        transactions.append({
-                            'date': row['Date'],
-                            'description': row['Description'],
-                            'amount': amount,
-                            'account': row['Account'],
-                            'who_paid': row['Who Paid'],
-                            'who_will_use': row['Who Will Use'],
-                            'method_of_payment': row['Method of Payment'],
-                            'type': row.get('Type', 'expense'),
-                            'parent_account': row.get('Parent Account', 'Select')
-                        })
-                        
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: Error processing row: {str(e)}")
-                        continue
-                        
-        except Exception as e:
-            errors.append(f"Error reading CSV file: {str(e)}")
+        Args:
+            csv_file_path: CSV file with the export column headers
+            chunk_size: Rows validated and saved per batch
+            max_errors: Most error messages kept in the result (all are counted)
+            workers: Processes parsing and validating the file (0 or 1 parses in this process)
         
-        return transactions, errors
+        Returns:
+            Row, import and rejection counts, the first max_errors errors and throughput
+        """
+        summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'errors': [], 'error_count': 0}
+        started = time.perf_counter()
+        
+        def report(error: str):
+            summary['error_count'] += 1
+            if len(summary['errors']) < max_errors:
+                summary['errors'].append(error)
+        
+        for rows, errors in self.iter_csv_transactions(csv_file_path, chunk_size, workers):
+            summary['rows'] += len(rows) + len(errors)
+            summary['rejected'] += len(errors)
+            for error in errors:
+                report(error)
+            if not rows:
+                continue
+            
+            results = self.add_transactions([Transaction(**data) for _, data in rows])
+            for (row_num, _), result in zip(rows, results):
+                if result['success']:
+                    summary['imported'] += 1
+                else:
+                    summary['rejected'] += 1
+                    report(f"Row {row_num}: {result['error']}")
+        
+        elapsed = time.perf_counter() - started
+        summary['workers'] = max(workers, 1)
+        summary['seconds'] = round(elapsed, 3)
+        summary['rows_per_second'] = round(summary['rows'] / elapsed) if elapsed > 0 else 0
+        return summary
     
     # Account management methods
+    @write_locked
     def add_parent_account(self, parent_account: str) -> bool:
         """Add a new parent account"""
         if parent_account not in self.parent_accounts:
             self.parent_accounts[parent_account] = []
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def remove_parent_account(self, parent_account: str) -> bool:
         """Remove a parent account and its sub-accounts"""
         if parent_account in self.parent_accounts:
             del self.parent_accounts[parent_account]
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def add_sub_account(self, parent_account: str, sub_account: str) -> bool:
         """Add a sub-account to a parent account"""
         if parent_account in self.parent_accounts:
             if sub_account not in self.parent_accounts[parent_account]:
                 self.parent_accounts[parent_account].append(sub_account)
-                self.save_data()
+                self._persist_settings()
                 return True
         return False
     
+    @write_locked
     def remove_sub_account(self, parent_account: str, sub_account: str) -> bool:
         """Remove a sub-account from a parent account"""
         if parent_account in self.parent_accounts:
             if sub_account in self.parent_accounts[parent_account]:
                 self.parent_accounts[parent_account].remove(sub_account)
-                self.save_data()
+                self._persist_settings()
                 return True
         return False
     
     # Roommate and payment method management
+    @write_locked
     def add_roommate(self, roommate: str) -> bool:
         """Add a new roommate"""
         if roommate not in self.roommates:
             self.roommates.append(roommate)
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def remove_roommate(self, roommate: str) -> bool:
         """Remove a roommate"""
         if roommate in self.roommates:
             self.roommates.remove(roommate)
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def add_payment_method(self, method: str) -> bool:
         """Add a new payment method"""
         if method not in self.payment_methods:
             self.payment_methods.append(method)
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def remove_payment_method(self, method: str) -> bool:
         """Remove a payment method"""
         if method in self.payment_methods:
             self.payment_methods.remove(method)
-            self.save_data()
+            self._persist_settings()
             return True
         return False
     
+    @write_locked
     def set_default_person(self, person: str) -> bool:
         """Set the default person"""
         self.default_person = person
-        self.save_data()
+        self._persist_settings()
         return True
     
+    @read_locked
     def get_statistics(self) -> Dict:
         """Get comprehensive statistics about the system"""
         total_transactions = len(self.transactions)
@@ -559,19 +1314,26 @@ class EnhancedTransactionManager:
             'total_accounts': total_accounts,
             'total_people_with_positive_balances': positive_balances,
             'total_people_with_negative_balances': negative_balances,
-            'data_file_size': os.path.getsize(self.data_file) if os.path.exists(self.data_file) else 0,
+            'data_file_size': self.storage.size_bytes(),
             'last_updated': self.metadata.get('last_updated', 'Unknown')
         }
 
-    def calculate_spending_overview(self, transactions=None):
-        """Calculate comprehensive spending overview for given transactions"""
-        if transactions is None:
-            transactions = self.transactions
-        
-        # Basic calculations
-        total_spent = sum(t.amount for t in transactions if t.type == 'expense')
-        total_income = sum(t.amount for t in transactions if t.type == 'income')
-        total_transactions = len(transactions)
+    @read_locked
+    def calculate_spending_overview(self, transactions=None, filters: Optional[Dict] = None):
+        """Calculate comprehensive spending overview for given transactions, or for those matching filters"""
+        if transactions is None and self._use_columnar():
+            totals = self._columnar.spending_overview(self._columnar_filter_mask(filters) if filters else None)
+            total_spent = totals['total_spent']
+            total_income = totals['total_income']
+            total_transactions = totals['transaction_count']
+        else:
+            if transactions is None:
+                transactions = self.filter_transactions(filters) if filters else self.transactions
+            
+            # Basic calculations
+            total_spent = sum(t.amount for t in transactions if t.type == 'expense')
+            total_income = sum(t.amount for t in transactions if t.type == 'income')
+            total_transactions = len(transactions)
         
         # Calculate oweings (simplified - this could be more complex)
         total_oweings = 0  # For now, we'll keep this simple
@@ -587,6 +1349,7 @@ class EnhancedTransactionManager:
             'transaction_count': total_transactions
         }
 
+    @read_locked
     def calculate_roommate_breakdown(self, transactions=None):
         """Calculate roommate spending breakdown excluding default person"""
         if transactions is None:
@@ -609,8 +1372,7 @@ class EnhancedTransactionManager:
         for transaction in transactions:
             if transaction.type == 'expense':
                 who_paid = transaction.who_paid
-                who_will_use = transaction.who_will_use.split(',') if transaction.who_will_use else []
-                who_will_use = [user.strip() for user in who_will_use]
+                who_will_use = transaction.participants
                 
                 # Track what each roommate spent
                 if who_paid in roommate_data:
@@ -643,24 +1405,70 @@ class EnhancedTransactionManager:
         
         return roommate_data
 
+    @write_locked
     def update_transaction(self, transaction_id: str, **updates) -> bool:
         """Update a transaction with new values"""
+        return self.update_transactions([dict(updates, id=transaction_id)])[0]['success']
+    
+    @write_locked
+    def update_transactions(self, patches: List[Dict]) -> List[Dict]:
+        """Apply a batch of {'id': ..., field: value} patches with a single persist; returns one result per patch"""
+        results = []
+        staged: Dict[str, Dict] = {}   # transaction id -> validated field values
+        valid_accounts = self._valid_accounts()
+        now = datetime.now().isoformat()
+        
+        # Validate every patch before touching any transaction
+        for row, patch in enumerate(patches):
+            transaction_id = patch.get('id')
+            result = {'row': row, 'id': transaction_id, 'success': False, 'error': None}
+            results.append(result)
+            try:
+                transaction = self._id_index.get(transaction_id)
+                if transaction is None:
+                    result['error'] = 'Transaction not found'
+                    continue
+                
+                values = {field: value for field, value in patch.items()
+                          if field in self.MUTABLE_FIELDS}
+                if 'amount' in values:
+                    values['amount'] = float(values['amount'])
+                
+                # Later patches for the same id build on the earlier ones
+                candidate = dict(transaction.to_dict(), **staged.get(transaction_id, {}), **values)
+                if not self._validate_transaction(Transaction.from_dict(candidate), valid_accounts):
+                    result['error'] = 'Missing or invalid fields'
+                    continue
+                
+                staged.setdefault(transaction_id, {}).update(values, updated_at=now)
+                result['success'] = True
+            except (TypeError, ValueError) as e:
+                result['error'] = f"Invalid value: {e}"
+        
+        if not staged:
+            return results
+        
+        originals = {transaction_id: self._id_index[transaction_id] for transaction_id in staged}
+        self._replace_transactions({transaction_id: replace(transaction, **staged[transaction_id])
+                                    for transaction_id, transaction in originals.items()})
+        
         try:
-            for transaction in self.transactions:
-                if transaction.id == transaction_id:
-                    # Update fields that are provided
-                    for field, value in updates.items():
-                        if hasattr(transaction, field):
-                            setattr(transaction, field, value)
-                    
-                    # Re-validate the transaction
-                    if self._validate_transaction(transaction):
-                        self.save_data()
-                        return True
-                    else:
-                        return False
-            
-            return False  # Transaction not found
+            self._persist([{'op': 'put', 'transaction': self._id_index[transaction_id].to_dict()}
+                           for transaction_id in staged])
         except Exception as e:
-            print(f"Error updating transaction: {e}")
-            return False
+            # All or nothing: put the previous versions back when the batch cannot be saved
+            print(f"Error updating transactions: {e}")
+            self._replace_transactions(originals)
+            for result in results:
+                if result['success']:
+                    result['success'] = False
+                    result['error'] = f"Save failed: {e}"
+        return results
+    
+    def _replace_transactions(self, replacements: Dict[str, Transaction]):
+        """Swap new versions of indexed transactions into the list and indexes"""
+        # Copy-on-write: stored objects are never mutated, so captured lists stay valid snapshots
+        for transaction_id, transaction in replacements.items():
+            self._unindex_transaction(self._id_index[transaction_id])
+            self.transactions[self._id_positions[transaction_id]] = transaction
+            self._index_transaction(transaction)
@@ -0,0 +1,201 @@
+"""
+Per-household workspaces
+Each household keeps its own transaction store under the workspaces directory.
+Managers are opened on first use and kept in an LRU cache bounded by a count
+and an estimated memory budget; idle ones are flushed and closed when the
+cache is over either limit
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.models.transaction_model import EnhancedTransactionManager
+
+# Household ids become directory names, so keep them to a safe alphabet
+HOUSEHOLD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_household_id(household_id: str) -> bool:
+    """Check that a household id is safe to use as a directory name"""
+    return bool(household_id) and bool(HOUSEHOLD_ID_PATTERN.match(household_id))
+
+
+class _Workspace:
+    """A loaded manager and the number of requests currently using it"""
+
+    __slots__ = ('manager', 'pins')
+
+    def __init__(self, manager: EnhancedTransactionManager):
+        self.manager = manager
+        self.pins = 0
+
+
+class WorkspaceRegistry:
+    """LRU cache of per-household transaction managers"""
+
+    def __init__(self, factory: Callable[[str, str], EnhancedTransactionManager],
+                 workspaces_dir: str = "workspaces", default_household: str = "luni_user",
+                 default_files: Optional[Tuple[str, str]] = None, max_loaded: int = 64,
+                 memory_budget_bytes: int = 256 * 1024 * 1024,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the registry
+
+        Args:
+            factory: Builds a manager from (data_file, db_file)
+            workspaces_dir: Directory holding one sub-directory per household
+            default_household: Household served when a session has not picked one
+            default_files: (data_file, db_file) of the default household, so the
+                pre-workspace store keeps working; defaults to a workspace directory
+            max_loaded: Most managers kept in memory at once
+            memory_budget_bytes: Estimated memory all loaded managers may use
+            on_evict: Called with a household id after its manager is evicted, so
+                per-household state kept outside the registry can be dropped too
+        """
+        self.factory = factory
+        self.workspaces_dir = workspaces_dir
+        self.default_household = default_household
+        self.default_files = default_files
+        self.max_loaded = max_loaded
+        self.memory_budget_bytes = memory_budget_bytes
+        self.on_evict = on_evict
+
+        # Least recently used first
+        self._workspaces: 'OrderedDict[str, _Workspace]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # One lock per household serializes opening it with closing an evicted copy
+        self._household_locks: Dict[str, threading.Lock] = {}
+        self.evictions = 0
+
+    def workspace_files(self, household_id: str) -> Tuple[str, str]:
+        """(data_file, db_file) backing a household's transactions"""
+        if household_id == self.default_household and self.default_files:
+            return self.default_files
+        directory = os.path.join(self.workspaces_dir, household_id)
+        return os.path.join(directory, "transactions.json"), os.path.join(directory, "transactions.db")
+
+    def _household_lock(self, household_id: str) -> threading.Lock:
+        with self._lock:
+            return self._household_locks.setdefault(household_id, threading.Lock())
+
+    def checkout(self, household_id: str) -> EnhancedTransactionManager:
+        """Get a household's manager, loading it if needed; pinned until release()"""
+        return self._acquire(household_id, pin=True)
+
+    def get(self, household_id: str) -> EnhancedTransactionManager:
+        """Get a household's manager without pinning it (it may be evicted later)"""
+        return self._acquire(household_id, pin=False)
+
+    def release(self, household_id: str):
+        """Unpin a manager taken with checkout() and evict idle managers if over budget"""
+        with self._lock:
+            workspace = self._workspaces.get(household_id)
+            if workspace is not None and workspace.pins:
+                workspace.pins -= 1
+            victims = self._select_victims()
+        self._close_victims(victims)
+
+    def _acquire(self, household_id: str, pin: bool) -> EnhancedTransactionManager:
+        if not is_valid_household_id(household_id):
+            raise ValueError(f"Invalid household id: {household_id!r}")
+
+        workspace = self._lookup(household_id, pin)
+        if workspace is not None:
+            return workspace.manager
+
+        # Load outside the registry lock so other households are not held up
+        with self._household_lock(household_id):
+            workspace = self._lookup(household_id, pin)
+            if workspace is not None:
+                return workspace.manager
+
+            data_file, db_file = self.workspace_files(household_id)
+            os.makedirs(os.path.dirname(data_file) or '.', exist_ok=True)
+            workspace = _Workspace(self.factory(data_file, db_file))
+            workspace.pins = 1 if pin else 0
+
+            with self._lock:
+                self._workspaces[household_id] = workspace
+                victims = self._select_victims(keep=household_id)
+
+        self._close_victims(victims)
+        return workspace.manager
+
+    def _lookup(self, household_id: str, pin: bool) -> Optional[_Workspace]:
+        with self._lock:
+            workspace = self._workspaces.get(household_id)
+            if workspace is not None:
+                self._workspaces.move_to_end(household_id)
+                if pin:
+                    workspace.pins += 1
+            return workspace
+
+    def _select_victims(self, keep: Optional[str] = None) -> List[Tuple[str, _Workspace, threading.Lock]]:
+        """Remove idle least-recently-used workspaces until both limits hold (registry lock held)"""
+        victims = []
+        memory = sum(w.manager.estimated_memory_bytes() for w in self._workspaces.values())
+
+        for household_id in list(self._workspaces):
+            if len(self._workspaces) <= self.max_loaded and memory <= self.memory_budget_bytes:
+                break
+            workspace = self._workspaces[household_id]
+            if workspace.pins or household_id == keep:
+                continue
+
+            # Hold the household lock until the close finishes, so a reopen waits for the flush
+            household_lock = self._household_locks.setdefault(household_id, threading.Lock())
+            if not household_lock.acquire(blocking=False):
+                continue
+            del self._workspaces[household_id]
+            memory -= workspace.manager.estimated_memory_bytes()
+            victims.append((household_id, workspace, household_lock))
+        return victims
+
+    def _close_victims(self, victims: List[Tuple[str, _Workspace, threading.Lock]]):
+        for household_id, workspace, household_lock in victims:
+            try:
+                try:
+                    closed = workspace.manager.close()
+                except Exception as e:
+                    print(f"Error closing workspace {household_id}: {e}")
+                    closed = False
+
+                if closed:
+                    self.evictions += 1
+                    if self.on_evict is not None:
+                        self.on_evict(household_id)
+                else:
+                    # Unflushed changes must not be dropped; keep the manager loaded and retry later
+                    print(f"Warning: Could not flush workspace {household_id}; keeping it loaded")
+                    with self._lock:
+                        self._workspaces.setdefault(household_id, workspace)
+            finally:
+                household_lock.release()
+
+    def close_all(self):
+        """Flush and close every loaded manager"""
+        with self._lock:
+            households = list(self._workspaces)
+
+        for household_id in households:
+            with self._household_lock(household_id):
+                with self._lock:
+                    workspace = self._workspaces.pop(household_id, None)
+                if workspace is not None and not workspace.manager.close():
+                    print(f"Warning: Could not flush workspace {household_id} on shutdown")
+
+    def get_status(self) -> Dict:
+        """Loaded households and how much of the budget they use"""
+        with self._lock:
+            return {
+                'loaded': len(self._workspaces),
+                'max_loaded': self.max_loaded,
+                'estimated_memory_bytes': sum(w.manager.estimated_memory_bytes()
+                                              for w in self._workspaces.values()),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'evictions': self.evictions
+            }
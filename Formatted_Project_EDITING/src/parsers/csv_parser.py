@@ -0,0 +1,243 @@
+"""
+Streaming CSV transaction parser
+Reads a CSV export row by row and yields validated transactions in chunks, so
+imports run in bounded memory and errors are reported as they are found.
+Rows are checked against a frozen snapshot of the roommate, payment method and
+account lists taken once per import. Large files can instead be split into
+byte ranges on row boundaries and parsed in a process pool. Exports stream
+the same columns back out, so an exported file imports unchanged
+"""
+
+import csv
+import io
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# CSV header -> transaction field for columns every row must fill
+REQUIRED_COLUMNS = {
+    'Date': 'date',
+    'Description': 'description',
+    'Amount': 'amount',
+    'Account': 'account',
+    'Who Paid': 'who_paid',
+    'Who Will Use': 'who_will_use',
+    'Method of Payment': 'method_of_payment'
+}
+
+# Optional CSV header -> (transaction field, value when the column is absent)
+OPTIONAL_COLUMNS = {
+    'Type': ('type', 'expense'),
+    'Parent Account': ('parent_account', 'Select')
+}
+
+# Export column order: the import columns, required first
+EXPORT_COLUMNS = list(REQUIRED_COLUMNS.items()) + [(column, field) for column, (field, _) in OPTIONAL_COLUMNS.items()]
+
+# Rows buffered per chunk of a streamed export
+EXPORT_ROWS_PER_CHUNK = 500
+
+# Currency symbols and thousands separators stripped before parsing amounts
+AMOUNT_NOISE = str.maketrans('', '', '$,')
+
+# Rows per chunk; each import chunk is one persist, so larger chunks mean fewer snapshot rewrites
+DEFAULT_CHUNK_SIZE = 5000
+
+# Bytes of CSV each pool worker parses per task
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+# Pool workers are spawned, not forked: the server's other threads may hold locks a forked child would inherit
+POOL_START_METHOD = 'spawn'
+
+
+@dataclass(frozen=True)
+class CSVCatalog:
+    """Names a CSV row may reference, frozen for O(1) membership checks"""
+    roommates: FrozenSet[str]
+    payment_methods: FrozenSet[str]
+    accounts: FrozenSet[str]
+
+
+def parse_amount(value: str) -> float:
+    """Parse an amount such as '$1,234.50'"""
+    return float(value.translate(AMOUNT_NOISE))
+
+
+def parse_csv_row(row: Dict[str, str], row_num: int, catalog: CSVCatalog) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Validate one CSV row
+
+    Returns:
+        (transaction data, None) for a valid row, otherwise (None, error message)
+    """
+    missing_fields = [column for column in REQUIRED_COLUMNS if not (row.get(column) or '').strip()]
+    if missing_fields:
+        return None, f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}"
+
+    # Validate data against system
+    if row['Who Paid'] not in catalog.roommates:
+        return None, f"Row {row_num}: 'Who Paid' ({row['Who Paid']}) not found in roommates list"
+
+    if row['Method of Payment'] not in catalog.payment_methods:
+        return None, f"Row {row_num}: 'Method of Payment' ({row['Method of Payment']}) not found in payment methods list"
+
+    if row['Account'] not in catalog.accounts:
+        return None, f"Row {row_num}: 'Account' ({row['Account']}) not found in accounts list"
+
+    try:
+        amount = parse_amount(row['Amount'])
+    except ValueError:
+        return None, f"Row {row_num}: Invalid amount format: {row['Amount']}"
+
+    data = {field: row[column] for column, field in REQUIRED_COLUMNS.items()}
+    data['amount'] = amount
+    for column, (field, default) in OPTIONAL_COLUMNS.items():
+        value = row.get(column)
+        data[field] = default if value is None else value
+    return data, None
+
+
+def iter_csv_chunks(file: TextIO, catalog: CSVCatalog, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    first_row: int = 2) -> Iterator[Tuple[List[Tuple[int, Dict]], List[str]]]:
+    """
+    Yield validated rows in chunks as the file is read
+
+    Args:
+        file: Open CSV file with a header line
+        catalog: Names rows are validated against
+        chunk_size: Rows read per chunk
+        first_row: Line number of the first data row, for error messages
+
+    Yields:
+        (rows, errors): (row number, transaction data) pairs and the errors of one chunk
+    """
+    rows: List[Tuple[int, Dict]] = []
+    errors: List[str] = []
+    count = 0
+
+    for row_num, row in enumerate(csv.DictReader(file), start=first_row):
+        try:
+            data, error = parse_csv_row(row, row_num, catalog)
+        except Exception as e:
+            data, error = None, f"Row {row_num}: Error processing row: {str(e)}"
+
+        if error:
+            errors.append(error)
+        else:
+            rows.append((row_num, data))
+
+        count += 1
+        if count == chunk_size:
+            yield rows, errors
+            rows, errors, count = [], [], 0
+
+    if rows or errors:
+        yield rows, errors
+
+
+def split_csv_ranges(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Tuple[List[str], List[Tuple[int, int, int]]]:
+    """
+    Split a CSV file into byte ranges that start and end on record boundaries
+
+    Quoted fields may span lines, so a line only ends a record when the quotes
+    seen so far are balanced. Blank lines are not records, as in csv.DictReader
+
+    Returns:
+        (header fields, [(start offset, end offset, row number of the first record)])
+    """
+    ranges = []
+    with open(path, 'rb') as f:
+        header = f.readline()
+        fieldnames = next(csv.reader([header.decode('utf-8')]), [])
+
+        start = offset = f.tell()
+        first_row = row_num = 2
+        in_quotes = False
+        for line in f:
+            if not in_quotes and line.strip(b'\r\n'):
+                row_num += 1
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            offset += len(line)
+
+            if not in_quotes and offset - start >= chunk_bytes:
+                ranges.append((start, offset, first_row))
+                start, first_row = offset, row_num
+
+        if offset > start:
+            ranges.append((start, offset, first_row))
+    return fieldnames, ranges
+
+
+def parse_csv_range(path: str, start: int, end: int, fieldnames: List[str], first_row: int,
+                    catalog: CSVCatalog) -> Tuple[List[Tuple[int, Dict]], List[str]]:
+    """Parse and validate one byte range of a CSV file (runs in a pool worker)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    rows: List[Tuple[int, Dict]] = []
+    errors: List[str] = []
+    for row_num, row in enumerate(csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames),
+                                  start=first_row):
+        try:
+            data, error = parse_csv_row(row, row_num, catalog)
+        except Exception as e:
+            data, error = None, f"Row {row_num}: Error processing row: {str(e)}"
+
+        if error:
+            errors.append(error)
+        else:
+            rows.append((row_num, data))
+    return rows, errors
+
+
+def iter_csv_chunks_parallel(path: str, catalog: CSVCatalog, workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[Tuple[List[Tuple[int, Dict]], List[str]]]:
+    """
+    Yield validated rows in file order, parsing byte ranges in a process pool
+
+    At most two ranges per worker are in flight, so memory stays bounded while
+    the caller saves earlier chunks. Yields the same (rows, errors) chunks as iter_csv_chunks
+    """
+    fieldnames, ranges = split_csv_ranges(path, chunk_bytes)
+    pending = deque()
+    next_range = 0
+
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                start, end, first_row = ranges[next_range]
+                pending.append(pool.submit(parse_csv_range, path, start, end, fieldnames, first_row, catalog))
+                next_range += 1
+
+            rows, errors = pending.popleft().result()
+            if not rows:
+                yield rows, errors
+            for i in range(0, len(rows), chunk_size):
+                yield rows[i:i + chunk_size], errors if i == 0 else []
+
+
+def iter_csv_export(transactions: Iterable) -> Iterator[str]:
+    """
+    Yield a CSV export in text chunks, quoting fields as needed
+
+    Memory is bounded by EXPORT_ROWS_PER_CHUNK rows, so the response can be
+    streamed whatever the size of the history
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = [field for _, field in EXPORT_COLUMNS]
+    writer.writerow([column for column, _ in EXPORT_COLUMNS])
+
+    for count, transaction in enumerate(transactions, start=1):
+        writer.writerow([getattr(transaction, field) for field in fields])
+        if count % EXPORT_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
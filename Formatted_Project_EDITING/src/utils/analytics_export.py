@@ -0,0 +1,163 @@
+"""
+Typed transaction exports for analysis pipelines
+JSON Lines is always available; Parquet and Arrow IPC need pyarrow. Every
+format carries the same typed columns: the date as a calendar date, the amount
+as integer cents and the categorical fields (dictionary-encoded in Arrow and
+Parquet), so downstream loads skip the CSV reparse. Incremental exports add
+one row per deleted id with deleted set and every other column empty
+"""
+
+import io
+import itertools
+import json
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.models.storage_backends import normalize_date
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+# Formats and the media type each is served with
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+# Low-cardinality string columns, dictionary-encoded in Arrow and Parquet
+CATEGORICAL_EXPORT_FIELDS = ('account', 'parent_account', 'who_paid', 'method_of_payment', 'type')
+
+# Rows per JSON Lines chunk and per Arrow record batch
+EXPORT_BATCH_ROWS = 1000
+
+
+def available_formats() -> List[str]:
+    """Export formats the installed libraries can write"""
+    return [name for name in EXPORT_FORMATS if name == 'jsonl' or PYARROW_AVAILABLE]
+
+
+def export_date(value: str) -> Optional[date]:
+    """Calendar date of a stored date (normalized as the date index does), or None if it cannot be parsed"""
+    try:
+        return date.fromisoformat(normalize_date(value))
+    except ValueError:
+        return None
+
+
+def amount_cents(amount) -> int:
+    """Amount in integer cents"""
+    try:
+        return int(round(float(amount) * 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+def export_record(transaction) -> Dict:
+    """One transaction with typed columns"""
+    parsed = export_date(transaction.date)
+    record = {
+        'id': transaction.id,
+        'date': parsed.isoformat() if parsed else None,
+        'amount_cents': amount_cents(transaction.amount),
+        'description': transaction.description
+    }
+    for field in CATEGORICAL_EXPORT_FIELDS:
+        record[field] = getattr(transaction, field)
+    record['participants'] = list(transaction.participants)
+    record['who_will_use'] = transaction.who_will_use
+    record['created_at'] = transaction.created_at
+    record['updated_at'] = transaction.updated_at
+    record['deleted'] = False
+    return record
+
+
+def tombstone_record(transaction_id: str) -> Dict:
+    """Marker telling an incremental consumer to drop a transaction"""
+    return {'id': transaction_id, 'deleted': True}
+
+
+def iter_jsonl(transactions: Iterable, deleted_ids: Iterable[str] = ()) -> Iterator[str]:
+    """Yield JSON Lines in chunks of EXPORT_BATCH_ROWS records, deletions last"""
+    records = itertools.chain(map(export_record, transactions), map(tombstone_record, deleted_ids))
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        if len(lines) == EXPORT_BATCH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _require_pyarrow(export_format: str):
+    if not PYARROW_AVAILABLE:
+        raise ValueError(f"The {export_format} export format needs pyarrow")
+
+
+def arrow_schema() -> "pa.Schema":
+    """Schema of the Arrow and Parquet exports"""
+    _require_pyarrow('arrow')
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [('id', pa.string()), ('date', pa.date32()), ('amount_cents', pa.int64()), ('description', pa.string())] +
+        [(field, categorical) for field in CATEGORICAL_EXPORT_FIELDS] +
+        [('participants', pa.list_(pa.string())), ('who_will_use', pa.string()),
+         ('created_at', pa.string()), ('updated_at', pa.string()), ('deleted', pa.bool_())]
+    )
+
+
+def iter_record_batches(transactions: List, schema: "pa.Schema") -> Iterator["pa.RecordBatch"]:
+    """Arrow record batches of EXPORT_BATCH_ROWS transactions"""
+    for start in range(0, len(transactions), EXPORT_BATCH_ROWS):
+        batch = transactions[start:start + EXPORT_BATCH_ROWS]
+        columns = {
+            'id': pa.array([t.id for t in batch], pa.string()),
+            'date': pa.array([export_date(t.date) for t in batch], pa.date32()),
+            'amount_cents': pa.array([amount_cents(t.amount) for t in batch], pa.int64()),
+            'description': pa.array([t.description for t in batch], pa.string()),
+            'participants': pa.array([list(t.participants) for t in batch], pa.list_(pa.string())),
+        }
+        for field in CATEGORICAL_EXPORT_FIELDS:
+            columns[field] = pa.array([getattr(t, field) for t in batch], pa.string()).dictionary_encode()
+        for field in ('who_will_use', 'created_at', 'updated_at'):
+            columns[field] = pa.array([getattr(t, field) for t in batch], pa.string())
+        columns['deleted'] = pa.array([False] * len(batch), pa.bool_())
+        yield pa.RecordBatch.from_arrays([columns[name] for name in schema.names], schema=schema)
+
+
+def iter_tombstone_batches(deleted_ids: List[str], schema: "pa.Schema") -> Iterator["pa.RecordBatch"]:
+    """Arrow record batches of deleted ids, every other column null"""
+    for start in range(0, len(deleted_ids), EXPORT_BATCH_ROWS):
+        batch = deleted_ids[start:start + EXPORT_BATCH_ROWS]
+        columns = [pa.array(batch, pa.string())]
+        columns += [pa.nulls(len(batch), schema.field(name).type) for name in schema.names[1:-1]]
+        columns.append(pa.array([True] * len(batch), pa.bool_()))
+        yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def write_columnar(transactions: List, export_format: str, deleted_ids: List[str] = ()) -> bytes:
+    """Encode transactions (and deleted ids) as a Parquet file or an Arrow IPC stream"""
+    _require_pyarrow(export_format)
+    schema = arrow_schema()
+    sink = io.BytesIO()
+    batches = itertools.chain(iter_record_batches(transactions, schema),
+                              iter_tombstone_batches(list(deleted_ids), schema))
+
+    if export_format == 'parquet':
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    elif export_format == 'arrow':
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        raise ValueError(f"Unknown columnar export format: {export_format}")
+    return sink.getvalue()
@@ -0,0 +1,125 @@
+"""
+Reader-writer lock for state shared between request threads
+Many readers may hold the lock together; a writer gets exclusive access and
+waiting writers block new readers so they are not starved. Both sides are
+reentrant, and a writer may also take the read lock
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class ReadWriteLock:
+    """Reentrant, writer-preferring reader-writer lock"""
+
+    def __init__(self, on_write_acquired: Optional[Callable[[], None]] = None,
+                 on_write_released: Optional[Callable[[], None]] = None):
+        """
+        Initialize the lock
+
+        Args:
+            on_write_acquired: Called once the outermost write lock is held
+            on_write_released: Called just before the outermost write lock is released
+        """
+        self.on_write_acquired = on_write_acquired
+        self.on_write_released = on_write_released
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}  # thread id -> read depth
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            # Nested reads (and reads inside a write) must not wait behind queued writers
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+        if self.on_write_acquired:
+            try:
+                self.on_write_acquired()
+            except BaseException:
+                self.release_write()
+                raise
+
+    def release_write(self):
+        try:
+            if self._write_depth == 1 and self.on_write_released:
+                self.on_write_released()
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+    @contextmanager
+    def read_lock(self):
+        """Hold the lock shared for the duration of a with block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_lock(self):
+        """Hold the lock exclusively for the duration of a with block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def read_locked(method):
+    """Run a method while holding self._rwlock shared"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rwlock.read_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def write_locked(method):
+    """Run a method while holding self._rwlock exclusively"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rwlock.write_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,159 @@
+"""
+Snapshot codec for the transaction data file
+Encodes the store either as plain JSON (portable, human-readable) or as a
+compact binary snapshot: a short header followed by msgpack or compact JSON,
+compressed with zstd or gzip. Uses the fastest installed codec (msgpack,
+orjson, zstandard) and falls back to the standard library
+"""
+
+import gzip
+import json
+from typing import Dict, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# Binary snapshot header: magic, format version, serializer code, compression code
+SNAPSHOT_MAGIC = b'LUNISNAP'
+SNAPSHOT_FORMAT_VERSION = 1
+HEADER_SIZE = len(SNAPSHOT_MAGIC) + 3
+
+SERIALIZER_CODES = {'json': b'j', 'msgpack': b'm'}
+COMPRESSION_CODES = {'none': b'n', 'gzip': b'g', 'zstd': b'z'}
+
+# Snapshot formats accepted by the JSON storage backend
+SNAPSHOT_FORMATS = ('json', 'binary')
+
+
+def best_serializer() -> str:
+    """Fastest serializer installed for binary snapshots"""
+    return 'msgpack' if MSGPACK_AVAILABLE else 'json'
+
+
+def best_compression() -> str:
+    """Fastest compression installed for binary snapshots"""
+    return 'zstd' if ZSTD_AVAILABLE else 'gzip'
+
+
+def describe_format(snapshot_format: str) -> Dict:
+    """Metadata entry describing how a snapshot is written"""
+    if snapshot_format == 'binary':
+        return {'version': SNAPSHOT_FORMAT_VERSION, 'serializer': best_serializer(),
+                'compression': best_compression()}
+    return {'version': SNAPSHOT_FORMAT_VERSION, 'serializer': 'json', 'compression': 'none'}
+
+
+def dumps_json(data: Dict, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, indented like the original transactions.json when asked"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads_json(raw: bytes) -> Dict:
+    """Parse UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def encode_snapshot(data: Dict, snapshot_format: str = 'json') -> bytes:
+    """
+    Encode a data file snapshot
+
+    Args:
+        data: Full data file document
+        snapshot_format: 'json' for indented plain JSON, 'binary' for the compact snapshot
+
+    Returns:
+        Bytes to write to the data file
+    """
+    if snapshot_format == 'json':
+        return dumps_json(data, indent=True)
+    if snapshot_format != 'binary':
+        raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+
+    serializer = best_serializer()
+    compression = best_compression()
+    if serializer == 'msgpack':
+        payload = msgpack.packb(data, use_bin_type=True)
+    else:
+        payload = dumps_json(data)
+
+    if compression == 'zstd':
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+    else:
+        payload = gzip.compress(payload, compresslevel=6, mtime=0)
+
+    header = (SNAPSHOT_MAGIC + bytes([SNAPSHOT_FORMAT_VERSION]) +
+              SERIALIZER_CODES[serializer] + COMPRESSION_CODES[compression])
+    return header + payload
+
+
+def decode_snapshot(raw: bytes) -> Optional[Dict]:
+    """Decode a data file, detecting plain JSON or a binary snapshot from its header"""
+    if not raw.startswith(SNAPSHOT_MAGIC):
+        if not raw.strip():
+            return None
+        return loads_json(raw)
+
+    header = raw[:HEADER_SIZE]
+    version = header[len(SNAPSHOT_MAGIC)]
+    if version > SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Snapshot format version {version} is newer than supported ({SNAPSHOT_FORMAT_VERSION})")
+
+    serializer_code = header[-2:-1]
+    compression_code = header[-1:]
+    payload = raw[HEADER_SIZE:]
+
+    if compression_code == COMPRESSION_CODES['zstd']:
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is required to read this snapshot")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression_code == COMPRESSION_CODES['gzip']:
+        payload = gzip.decompress(payload)
+    elif compression_code != COMPRESSION_CODES['none']:
+        raise ValueError(f"Unknown snapshot compression: {compression_code!r}")
+
+    if serializer_code == SERIALIZER_CODES['msgpack']:
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack is required to read this snapshot")
+        return msgpack.unpackb(payload, raw=False)
+    if serializer_code == SERIALIZER_CODES['json']:
+        return loads_json(payload)
+    raise ValueError(f"Unknown snapshot serializer: {serializer_code!r}")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 4 or sys.argv[3] not in SNAPSHOT_FORMATS:
+        print("Usage: python -m src.utils.snapshot_codec <input> <output> <json|binary>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'rb') as f:
+        document = decode_snapshot(f.read())
+    document.setdefault('metadata', {})['snapshot_format'] = describe_format(sys.argv[3])
+    with open(sys.argv[2], 'wb') as f:
+        f.write(encode_snapshot(document, sys.argv[3]))
+    print(f"Wrote {len(document.get('transactions', []))} transactions to {sys.argv[2]} as {sys.argv[3]}")
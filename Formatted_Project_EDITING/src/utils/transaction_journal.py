@@ -0,0 +1,123 @@
+"""
+Append-only journal for transaction store mutations
+Records small JSON lines next to the snapshot file so a write no longer
+re-serializes the whole history; compaction folds them back into the snapshot
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Tuple
+
+
+class TransactionJournal:
+    """Write-ahead log of transaction store mutations (one JSON record per line)"""
+
+    def __init__(self, journal_file: str, compact_threshold: int = 500):
+        """
+        Initialize the journal
+
+        Args:
+            journal_file: Path to the active journal file
+            compact_threshold: Number of records after which compaction should run
+        """
+        self.journal_file = journal_file
+        self.compacting_file = f"{journal_file}.compacting"
+        self.compact_threshold = compact_threshold
+        self.record_count = 0
+        self._lock = threading.Lock()
+
+    def append(self, records: List[Dict]) -> None:
+        """Append records to the journal and flush them to disk"""
+        if not records:
+            return
+
+        payload = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count += sum(self._weight(record) for record in records)
+
+    def read_records(self) -> List[Dict]:
+        """Read all pending records, oldest first (interrupted compaction included)"""
+        records = []
+        for path in (self.compacting_file, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append is expected; skip it
+                        print(f"Warning: Skipping unreadable journal record {path}:{line_num}")
+
+        with self._lock:
+            self.record_count = sum(self._weight(record) for record in records)
+        return records
+
+    @staticmethod
+    def _weight(record: Dict) -> int:
+        """Number of mutations in a record (batch records count their contents)"""
+        if record.get('op') == 'batch':
+            return len(record.get('records', []))
+        return 1
+
+    def read_from(self, offset: int) -> Tuple[List[Dict], int]:
+        """Read complete records appended after a byte offset; returns them and the offset reached"""
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+
+        # A line without its newline is still being written; leave it for the next read
+        end = data.rfind(b'\n') + 1
+        records = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Warning: Skipping unreadable journal record in {self.journal_file}")
+
+        with self._lock:
+            self.record_count += sum(self._weight(record) for record in records)
+        return records, offset + end
+
+    def needs_compaction(self) -> bool:
+        """Check whether enough records have accumulated to compact"""
+        return self.record_count >= self.compact_threshold
+
+    def rotate(self) -> None:
+        """Move the active journal aside so a snapshot can absorb it"""
+        with self._lock:
+            if not os.path.exists(self.journal_file):
+                return
+
+            if os.path.exists(self.compacting_file):
+                # A previous compaction never finished; keep its records ahead of ours
+                with open(self.journal_file, 'r', encoding='utf-8') as src, \
+                        open(self.compacting_file, 'a', encoding='utf-8') as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, self.compacting_file)
+
+            self.record_count = 0
+
+    def finish_compaction(self) -> None:
+        """Drop the rotated journal once its records are in the snapshot"""
+        try:
+            os.remove(self.compacting_file)
+        except FileNotFoundError:
+            pass